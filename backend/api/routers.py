@@ -1,7 +1,13 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Literal
 from backend.services.tree_service import tree_service
-from backend.services.prediction_service import prediction_service
+from backend.services.batching_service import model_key, prediction_batcher
+from backend.services import model_service
+from backend.services.counterfactual_service import counterfactuals, counterfactuals_batch
+from backend.services.region_service import decision_regions, RESOLUTION, MAX_RESOLUTION
+from backend.services.importance_service import importance_service, N_REPEATS, SEED
 from typing import Any
 
 router = APIRouter()
@@ -17,10 +23,106 @@ def train():
 
 class PredictRequest(BaseModel):
     tree: dict[str, Any]
-    x: list[float]
+    x: list[float | None]  # null = missing value
+    counterfactuals: bool = False  # Also return the nearest input of every other class
+    norm: Literal["l1", "l2"] = "l2"
+    scale: list[float] | None = None  # Per-feature divisor of the counterfactual distance
 
 @router.post("/predict")
-def predict(req: PredictRequest):
-    x = req.x
+async def predict(req: PredictRequest):
+    x = [float("nan") if v is None else v for v in req.x]
     tree = req.tree
-    return prediction_service(tree, x)
\ No newline at end of file
+    key = model_key(tree)
+    result = await prediction_batcher.submit(tree, x, key)
+    if req.counterfactuals:
+        try:
+            # Building the leaf box index on a cache miss is CPU-bound: keep it off the event loop
+            result.counterfactuals = await run_in_threadpool(counterfactuals, tree, x, req.scale, req.norm, key)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return result
+
+class CounterfactualRequest(BaseModel):
+    tree: dict[str, Any]
+    x: list[list[float | None]]  # null = missing value
+    norm: Literal["l1", "l2"] = "l2"
+    scale: list[float] | None = None  # Per-feature divisor of the distance
+
+@router.post("/counterfactuals")
+def counterfactuals_route(req: CounterfactualRequest):
+    X = [[float("nan") if v is None else v for v in row] for row in req.x]
+    try:
+        return [[c.to_dict() for c in row] for row in counterfactuals_batch(req.tree, X, req.scale, req.norm)]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class ImportanceRequest(BaseModel):
+    tree: dict[str, Any]
+    x: list[list[float | None]] | None = None  # Evaluation data (null = missing); defaults to the Iris test split
+    y: list[float] | None = None  # Class labels, or targets for regression trees
+    n_repeats: int = Field(N_REPEATS, ge=1, le=200)
+    seed: int = SEED
+
+@router.post("/importance")
+def importance(req: ImportanceRequest):
+    X = None if req.x is None else [[float("nan") if v is None else v for v in row] for row in req.x]
+    try:
+        return importance_service(req.tree, X, req.y, req.n_repeats, req.seed).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class RegionRequest(BaseModel):
+    tree: dict[str, Any]
+    feature_x: int
+    feature_y: int
+    x: list[float | None]  # Values of every feature; null = missing value
+    mode: Literal["rectangles", "grid"] = "rectangles"
+    resolution: int = Field(RESOLUTION, ge=2, le=MAX_RESOLUTION)
+    x_range: list[float] | None = None
+    y_range: list[float] | None = None
+
+@router.post("/regions")
+def regions(req: RegionRequest):
+    x = [float("nan") if v is None else v for v in req.x]
+    try:
+        return decision_regions(req.tree, req.feature_x, req.feature_y, x, req.mode,
+                                req.resolution, req.x_range, req.y_range).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+class PublishRequest(BaseModel):
+    tree: dict[str, Any]
+
+class StoredPredictRequest(BaseModel):
+    x: list[float | None]  # null = missing value
+    version: int | None = None
+
+@router.get("/models")
+def list_models():
+    return model_service.list_models()
+
+@router.post("/models/{name}")
+def publish_model(name: str, req: PublishRequest):
+    try:
+        return model_service.publish_model(name, req.tree)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/models/{name}")
+def get_model(name: str, version: int | None = None):
+    try:
+        return model_service.get_model(name, version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/models/{name}/predict")
+def predict_model(name: str, req: StoredPredictRequest):
+    x = [float("nan") if v is None else v for v in req.x]
+    try:
+        return model_service.predict_model(name, x, req.version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
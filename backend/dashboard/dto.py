@@ -1,7 +1,10 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, TYPE_CHECKING
 import math
 
+if TYPE_CHECKING:
+    import numpy as np
+
 def _json_safe(x: Any) -> Any:
     """
     Recursively convert an object to a JSON-safe representation.
@@ -42,6 +45,22 @@ def _json_safe(x: Any) -> Any:
     # Fallback: convert to string
     return str(x)
 
+def _counts_dict(counts: Any) -> dict[int, int] | None:
+    """
+    Convert class counts to a {class: count} dictionary.
+    Accepts either a mapping or a fixed-length count vector (index = class),
+    in which case classes with a zero count are omitted.
+    Args:
+        counts (Any): Mapping or count vector.
+    Returns:
+        dict[int, int] | None: Class distribution, or None if counts is None.
+    """
+    if counts is None:
+        return None
+    if isinstance(counts, dict):
+        return {int(k): int(v) for k, v in counts.items()}
+    return {i: int(c) for i, c in enumerate(counts) if c}
+
 class TreeNodeDTO:
     """
     Data Transfer Object representing a node in a decision tree.
@@ -50,31 +69,44 @@ class TreeNodeDTO:
         id (int): Unique node identifier.
         feature (int | None): Index of the splitting feature (None for leaves).
         threshold (float | None): Threshold value for split (None for leaves).
-        value (int | None): Class label or value (for leaves).
+        value (int | float | None): Class label, or predicted value for regression trees (for leaves).
         information_gain (float | None): Information gain from split (None for leaves).
         is_leaf (bool): Indicates if node is a leaf.
-        samples (int | None): Number of samples at node.
-        class_counts (dict[int, int] | None): Class distribution at node.
+        samples (np.ndarray | dict[int, int] | None): Class distribution at node.
+        class_counts (np.ndarray | dict[int, int] | None): Class distribution at node.
         depth (int | None): Depth of node in tree.
         predicted_class (int | None): Predicted class at node.
         left_id (int | None): Id of the left child.
         right_id (int | None): Id of the right child.
+        categories (list[int] | None): Category codes sent left (categorical splits only).
+        missing_left (bool | None): Whether missing values go left (None = right).
+        mean (float | None): Mean target at node (regression trees, in place of class counts).
+        variance (float | None): Target variance at node (regression trees).
+        n_samples (int | None): Number of training samples at node.
     """
+    __slots__ = ("id", "feature", "threshold", "value", "information_gain", "is_leaf",
+                 "samples", "class_counts", "depth", "predicted_class", "left_id", "right_id",
+                 "categories", "missing_left", "mean", "variance", "n_samples")
+
     def __init__(
         self,
         id: int = None,
         feature: int | None = None,
         threshold: float | None = None,
-        value: int | None = None,
+        value: int | float | None = None,
         information_gain: float | None = None,
         is_leaf: bool = None,
-        samples: int | None = None,
-        class_counts: dict[int, int] | None = None,
+        samples: np.ndarray | dict[int, int] | None = None,
+        class_counts: np.ndarray | dict[int, int] | None = None,
         depth: int | None = None,
         predicted_class: int | None = None,
         left_id: int | None = None,
-        right_id: int | None = None
-        
+        right_id: int | None = None,
+        categories: list[int] | None = None,
+        missing_left: bool | None = None,
+        mean: float | None = None,
+        variance: float | None = None,
+        n_samples: int | None = None
     ):
         self.id = id  # Unique node identifier
         self.feature = feature  # Index of splitting feature (None for leaves)
@@ -88,6 +120,11 @@ class TreeNodeDTO:
         self.predicted_class = predicted_class  # Predicted class at node
         self.left_id = left_id  # Id of the left child
         self.right_id = right_id  # Id of the right child
+        self.categories = categories  # Category codes sent left (categorical splits)
+        self.missing_left = missing_left  # Whether missing values go left
+        self.mean = mean  # Mean target at node (regression)
+        self.variance = variance  # Target variance at node (regression)
+        self.n_samples = n_samples  # Training samples at node
         
     def to_dict(self) -> dict[str, Any]:
         """
@@ -99,16 +136,20 @@ class TreeNodeDTO:
             "id": str(self.id) if self.id is not None else None,
             "feature": self.feature,
             "threshold": _json_safe(self.threshold),
-            "value": None if self.value is None else int(self.value),
+            "value": _json_safe(self.value),
             "information_gain": _json_safe(self.information_gain),
             "is_leaf": self.is_leaf,
-            "samples": None if self.samples is None else {int(k): int(v) for k, v in self.samples.items()},
-            "class_counts": None if self.class_counts is None else {int(k): int(v) for k, v in self.class_counts.items()},
+            "samples": _counts_dict(self.samples),
+            "class_counts": _counts_dict(self.class_counts),
             "depth": None if self.depth is None else int(self.depth),
             "predicted_class": None if self.predicted_class is None else int(self.predicted_class),
             "left_id": str(self.left_id) if self.left_id is not None else None,
-            "right_id": str(self.right_id) if self.right_id is not None else None
-            
+            "right_id": str(self.right_id) if self.right_id is not None else None,
+            "categories": None if self.categories is None else [int(c) for c in self.categories],
+            "missing_left": None if self.missing_left is None else bool(self.missing_left),
+            "mean": _json_safe(self.mean),
+            "variance": _json_safe(self.variance),
+            "n_samples": None if self.n_samples is None else int(self.n_samples),
         }
 
     def __repr__(self) -> str:
@@ -127,23 +168,33 @@ class TreeEdgeDTO:
         source (int): Source node identifier.
         target (int): Target node identifier.
         branch (str): Indicates which branch this edge represents ("left" or "right").
-        operator (str): The comparison operator used for the split ("<=" for left, ">" for right).
+        operator (str): The comparison operator used for the split ("<=" / ">" for numeric
+            splits, "in" / "not in" for categorical splits).
         feature (int): Index of the feature used for the split at this edge.
         threshold (float): Threshold value for the split at this edge.
+        categories (list[int] | None): Category set of the split (categorical splits only).
+        missing (bool): Whether missing values follow this edge.
     """
+    __slots__ = ("source", "target", "branch", "operator", "feature", "threshold",
+                 "categories", "missing")
+
     def __init__(self, 
                  source: int = None, 
                  target: int = None, 
                  branch: str = None,
                  operator: str = None,
                  feature: int = None,
-                 threshold: float = None):
+                 threshold: float = None,
+                 categories: list[int] | None = None,
+                 missing: bool = False):
         self.source = source  # Source node identifier
         self.target = target  # Target node identifier
         self.branch = branch  # Branch identifier ("left" or "right")
         self.operator = operator  # Comparison operator ("<=", ">")
         self.feature = feature  # Index of feature used for split
         self.threshold = threshold  # Threshold value for split
+        self.categories = categories  # Category set of the split
+        self.missing = missing  # Whether missing values follow this edge
     
     def to_dict(self) -> dict[str, Any]:
         """
@@ -158,6 +209,8 @@ class TreeEdgeDTO:
             "operator": self.operator,
             "feature": self.feature,
             "threshold": _json_safe(self.threshold),
+            "categories": None if self.categories is None else [int(c) for c in self.categories],
+            "missing": bool(self.missing),
         }
 
     def __repr__(self) -> str:
@@ -171,31 +224,61 @@ class TreeEdgeDTO:
 class TreeResponseDTO:
     """
     Data Transfer Object for decision tree response, including structure and metrics.
+    Edges are not stored; they are derived on demand from each node's child ids.
 
     Attributes:
         root_id (int): Root node identifier.
         nodes (list[TreeNodeDTO]): List of tree nodes.
-        edges (list[TreeEdgeDTO]): List of tree edges.
+        edges (list[TreeEdgeDTO]): List of tree edges (read-only, derived from nodes).
         feature_names (list[str]): List of feature names in dataset.
         label_names (list[str]): List of label/class names in dataset.
+        task (str): "classification" or "regression".
     """
+    __slots__ = ("nodes", "root_id", "feature_names", "label_names",
+                 "confusion_matrix", "confusion_matrix_metadata", "task")
+
     def __init__(
         self,
         confusion_matrix = None,
         confusion_matrix_metadata = None,
         root_id: int = None,
         nodes: list[TreeNodeDTO] = None,
-        edges: list[TreeEdgeDTO] = None,
         feature_names: list[str] = None,
         label_names: list[str] = None,
+        task: str = "classification",
     ):
         self.nodes = nodes  # List of tree nodes
-        self.edges = edges  # List of tree edges
         self.root_id = root_id  # Root node identifier
         self.feature_names = feature_names  # List of feature names
         self.label_names = label_names  # List of label/class names
         self.confusion_matrix = confusion_matrix # List of values for confusion matrix
         self.confusion_matrix_metadata = confusion_matrix_metadata # Dict of metadata for conf_matrix
+        self.task = task  # Classification or regression tree
+
+    def iter_edges(self):
+        """
+        Yield a TreeEdgeDTO for every parent -> child link, left before right,
+        in node order.
+        Yields:
+            TreeEdgeDTO: Edge built from the parent's split.
+        """
+        for n in self.nodes or ():
+            categorical = n.categories is not None
+            if n.left_id is not None:
+                yield TreeEdgeDTO(n.id, n.left_id, "left", "in" if categorical else "<=",
+                                  n.feature, n.threshold, n.categories, bool(n.missing_left))
+            if n.right_id is not None:
+                yield TreeEdgeDTO(n.id, n.right_id, "right", "not in" if categorical else ">",
+                                  n.feature, n.threshold, n.categories, not n.missing_left)
+
+    @property
+    def edges(self) -> list[TreeEdgeDTO]:
+        """
+        List of tree edges, derived from the nodes.
+        Returns:
+            list[TreeEdgeDTO]: All edges of the tree.
+        """
+        return list(self.iter_edges())
         
     def to_dict(self) -> dict[str, Any]:
         """
@@ -206,16 +289,17 @@ class TreeResponseDTO:
         return {
             "root_id": str(self.root_id) if self.root_id is not None else None,
             "nodes": [] if not self.nodes else [n.to_dict() for n in self.nodes],
-            "edges": [] if not self.edges else [e.to_dict() for e in self.edges],
+            "edges": [e.to_dict() for e in self.iter_edges()],
             "feature_names": [] if self.feature_names is None else list(self.feature_names),
             "label_names": [] if self.label_names is None else list(self.label_names),
             "confusion_matrix": _json_safe(self.confusion_matrix),
             "confusion_matrix_metadata": _json_safe(self.confusion_matrix_metadata),
+            "task": self.task,
         }
 
     def __repr__(self) -> str:
         n = 0 if not self.nodes else len(self.nodes)
-        e = 0 if not self.edges else len(self.edges)
+        e = sum(1 for _ in self.iter_edges())
         return f"TreeResponseDTO(root_id={self.root_id}, nodes={n}, edges={e})"
 
 
@@ -226,10 +310,186 @@ class PredictionDTO:
     Attributes:
         predicted_class (int | None): Predicted class label.
         path (list[int] | None): List of node IDs representing the path taken in the tree.
+        counterfactuals (list[CounterfactualDTO] | None): Nearest input of each other class, when requested.
     """
     def __init__(self,
                  predicted_class: int | None = None,
-                 path: list[int] | None = None):
+                 path: list[int] | None = None,
+                 counterfactuals: list[CounterfactualDTO] | None = None):
         self.predicted_class = predicted_class  # Predicted class label
         self.path = path  # Path of node IDs traversed for this prediction
+        self.counterfactuals = counterfactuals  # Smallest changes that flip the prediction
+
+
+class CounterfactualDTO:
+    """
+    Data Transfer Object for the smallest change of an input that yields another class.
+
+    Attributes:
+        target_class (int): Class the changed input is predicted as.
+        distance (float): Scaled L1/L2 distance from the original input.
+        leaf_id (int | None): ID of the leaf the changed input lands in.
+        x (list[float | None]): Changed input (None = still missing).
+        changed_features (list[int]): Indices of the features that differ from the original input.
+    """
+    def __init__(self,
+                 target_class: int,
+                 distance: float,
+                 leaf_id: int | None = None,
+                 x: list[float | None] | None = None,
+                 changed_features: list[int] | None = None):
+        self.target_class = target_class  # Class after the change
+        self.distance = distance  # Cost of the change
+        self.leaf_id = leaf_id  # Leaf reached by the changed input
+        self.x = x  # Changed input
+        self.changed_features = changed_features  # Features that were changed
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the CounterfactualDTO to a JSON-serializable dictionary.
+        Returns:
+            dict[str, Any]: Dictionary representation of the counterfactual.
+        """
+        return {
+            "target_class": self.target_class,
+            "distance": _json_safe(self.distance),
+            "leaf_id": self.leaf_id,
+            "x": _json_safe(self.x),
+            "changed_features": [] if self.changed_features is None else list(self.changed_features),
+        }
+
+    def __repr__(self) -> str:
+        return (f"CounterfactualDTO(target_class={self.target_class}, distance={self.distance}, "
+                f"changed_features={self.changed_features})")
+
+
+
+class FeatureImportanceDTO:
+    """
+    Data Transfer Object for global feature importance.
+
+    Attributes:
+        feature_names (list[str]): Feature names, in feature index order.
+        impurity_importance (list[float]): Sample-weighted information gain per feature, normalized to sum to 1.
+        permutation_mean (list[float] | None): Mean accuracy drop (MSE increase for regression)
+            when the feature is permuted.
+        permutation_std (list[float] | None): Standard deviation of that drop across repeats.
+        ci_low (list[float] | None): Lower bound of the confidence interval of the mean drop.
+        ci_high (list[float] | None): Upper bound of the confidence interval of the mean drop.
+        confidence (float | None): Confidence level of the interval (e.g. 0.95).
+        baseline_accuracy (float | None): Accuracy on the unpermuted data (classification).
+        n_repeats (int | None): Permutations per feature.
+        seed (int | None): Seed the permutations were drawn from.
+        metric (str): "accuracy" for classification trees, "mse" for regression trees.
+        baseline_mse (float | None): Mean squared error on the unpermuted data (regression).
+    """
+    def __init__(self,
+                 feature_names: list[str] | None = None,
+                 impurity_importance: list[float] | None = None,
+                 permutation_mean: list[float] | None = None,
+                 permutation_std: list[float] | None = None,
+                 ci_low: list[float] | None = None,
+                 ci_high: list[float] | None = None,
+                 confidence: float | None = None,
+                 baseline_accuracy: float | None = None,
+                 n_repeats: int | None = None,
+                 seed: int | None = None,
+                 metric: str = "accuracy",
+                 baseline_mse: float | None = None):
+        self.feature_names = feature_names  # Feature names
+        self.impurity_importance = impurity_importance  # Split-based importance per feature
+        self.permutation_mean = permutation_mean  # Mean score drop per feature
+        self.permutation_std = permutation_std  # Std of score drop per feature
+        self.ci_low = ci_low  # Lower confidence bound per feature
+        self.ci_high = ci_high  # Upper confidence bound per feature
+        self.confidence = confidence  # Confidence level of the interval
+        self.baseline_accuracy = baseline_accuracy  # Accuracy before permuting
+        self.n_repeats = n_repeats  # Permutations per feature
+        self.seed = seed  # Seed of the permutations
+        self.metric = metric  # Score the drops are measured in
+        self.baseline_mse = baseline_mse  # MSE before permuting (regression)
 
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the FeatureImportanceDTO to a JSON-serializable dictionary.
+        Returns:
+            dict[str, Any]: Dictionary representation of the importances.
+        """
+        return {
+            "feature_names": [] if self.feature_names is None else [str(f) for f in self.feature_names],
+            "impurity_importance": _json_safe(self.impurity_importance),
+            "permutation_mean": _json_safe(self.permutation_mean),
+            "permutation_std": _json_safe(self.permutation_std),
+            "ci_low": _json_safe(self.ci_low),
+            "ci_high": _json_safe(self.ci_high),
+            "confidence": _json_safe(self.confidence),
+            "baseline_accuracy": _json_safe(self.baseline_accuracy),
+            "n_repeats": self.n_repeats,
+            "seed": self.seed,
+            "metric": self.metric,
+            "baseline_mse": _json_safe(self.baseline_mse),
+        }
+
+    def __repr__(self) -> str:
+        n = 0 if not self.feature_names else len(self.feature_names)
+        return f"FeatureImportanceDTO(features={n}, n_repeats={self.n_repeats}, seed={self.seed})"
+
+
+class DecisionRegionDTO:
+    """
+    Data Transfer Object for the decision regions of a tree on a pair of features.
+
+    Attributes:
+        feature_x (int): Feature on the horizontal axis.
+        feature_y (int): Feature on the vertical axis.
+        mode (str): "rectangles" (exact leaf boxes) or "grid" (rasterised classes).
+        x_range (list[float]): [min, max] of the horizontal axis.
+        y_range (list[float]): [min, max] of the vertical axis.
+        rectangles (list[dict[str, Any]] | None): x0, x1, y0, y1 (None on a categorical axis),
+            x_categories, y_categories, predicted_class and leaf_id per region.
+        xs (list[float] | None): Horizontal sample positions of the grid.
+        ys (list[float] | None): Vertical sample positions of the grid.
+        grid (np.ndarray | None): Predicted class per (y, x) grid cell; a list of rows in to_dict().
+    """
+    def __init__(self,
+                 feature_x: int,
+                 feature_y: int,
+                 mode: str,
+                 x_range: list[float] | None = None,
+                 y_range: list[float] | None = None,
+                 rectangles: list[dict[str, Any]] | None = None,
+                 xs: list[float] | None = None,
+                 ys: list[float] | None = None,
+                 grid: Any = None):
+        self.feature_x = feature_x  # Horizontal axis feature
+        self.feature_y = feature_y  # Vertical axis feature
+        self.mode = mode  # How the regions were computed
+        self.x_range = x_range  # Horizontal axis extent
+        self.y_range = y_range  # Vertical axis extent
+        self.rectangles = rectangles  # Exact regions
+        self.xs = xs  # Grid columns
+        self.ys = ys  # Grid rows
+        self.grid = grid  # Class per grid cell
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the DecisionRegionDTO to a JSON-serializable dictionary.
+        Returns:
+            dict[str, Any]: Dictionary representation of the decision regions.
+        """
+        return {
+            "feature_x": self.feature_x,
+            "feature_y": self.feature_y,
+            "mode": self.mode,
+            "x_range": _json_safe(self.x_range),
+            "y_range": _json_safe(self.y_range),
+            "rectangles": _json_safe(self.rectangles),
+            "xs": _json_safe(self.xs),
+            "ys": _json_safe(self.ys),
+            "grid": _json_safe(self.grid),
+        }
+
+    def __repr__(self) -> str:
+        n = len(self.rectangles) if self.rectangles is not None else 0
+        return (f"DecisionRegionDTO(feature_x={self.feature_x}, feature_y={self.feature_y}, "
+                f"mode={self.mode!r}, rectangles={n})")
@@ -11,20 +11,19 @@ def export_tree(
     confusion_matrix_metadata):
     
     dto_nodes = []
-    dto_edges = []
     
-    dto_nodes, dto_edges = __walk__(tree.root, dto_nodes, dto_edges)
+    if tree.root is not None:
+        dto_nodes = __walk__(tree.root, dto_nodes, getattr(tree, "classes", None))
     dto_response = dto.TreeResponseDTO()
-    dto_response.edges = dto_edges
     dto_response.nodes = dto_nodes
     dto_response.feature_names = feature_names
     dto_response.confusion_matrix = confusion_matrix
     dto_response.confusion_matrix_metadata = confusion_matrix_metadata
+    dto_response.task = tree.task
     
     if tree.root is None:
         dto_response.root_id = None
         dto_response.nodes = []
-        dto_response.edges = []
         return dto_response
 
     else:
@@ -37,7 +36,8 @@ def export_tree(
 def __buildnode__(node: tree.Node, 
                   dto_node: dto.TreeNodeDTO, 
                   id: int, 
-                  depth: int):
+                  depth: int,
+                  classes=None):
     
     dto_node.id = id
     dto_node.feature = node.feature
@@ -46,32 +46,20 @@ def __buildnode__(node: tree.Node,
     dto_node.information_gain = node.IG
     dto_node.is_leaf = node.is_leaf()
     dto_node.samples = node.class_counts
+    if classes is not None and node.class_counts is not None:
+        # Count vectors are indexed by class position; export them keyed by label
+        dto_node.samples = {classes[i].item(): int(c) for i, c in enumerate(node.class_counts) if c}
     dto_node.depth = depth
     dto_node.predicted_class = node.predicted_class
+    dto_node.categories = node.categories
+    dto_node.missing_left = node.missing_left
+    dto_node.mean = node.mean
+    dto_node.variance = node.variance
+    dto_node.n_samples = node.samples
     
     return dto_node
 
-def __buildedge__(parent_id, child_id, threshold, feature, branch):
-    
-    new_edge = dto.TreeEdgeDTO()
-    new_edge.branch = branch
-    new_edge.source = parent_id
-    new_edge.target = child_id
-    
-    if branch == "left":
-        operator = "<="
-    else:
-        operator = ">"
-        
-    new_edge.operator = operator
-    new_edge.feature = feature
-    new_edge.threshold = threshold
-    
-    return new_edge
-    
-    
-    
-def __walk__(root_node: tree.Node, dto_nodes, dto_edges):
+def __walk__(root_node: tree.Node, dto_nodes, classes=None):
 
     queue = deque([(root_node, 0)])
     node_to_id = {}
@@ -85,7 +73,8 @@ def __walk__(root_node: tree.Node, dto_nodes, dto_edges):
         new_dto_node = __buildnode__(curr_node, 
                                      new_dto_node, 
                                      node_to_id[curr_node], 
-                                     depth)
+                                     depth,
+                                     classes)
         
         if curr_node.left is not None:
             if curr_node.left not in node_to_id:
@@ -93,11 +82,6 @@ def __walk__(root_node: tree.Node, dto_nodes, dto_edges):
                 next_id += 1
                 queue.append((curr_node.left, depth+1))
 
-            dto_edges.append(__buildedge__(node_to_id[curr_node],
-                                        node_to_id[curr_node.left],
-                                        curr_node.threshold,
-                                        curr_node.feature,
-                                        "left"))
             new_dto_node.left_id = node_to_id[curr_node.left]
         else:
             new_dto_node.left_id = None
@@ -109,11 +93,6 @@ def __walk__(root_node: tree.Node, dto_nodes, dto_edges):
                 next_id += 1
                 queue.append((curr_node.right, depth+1))
 
-            dto_edges.append(__buildedge__(node_to_id[curr_node],
-                                        node_to_id[curr_node.right],
-                                        curr_node.threshold,
-                                        curr_node.feature,
-                                        "right"))
             new_dto_node.right_id = node_to_id[curr_node.right]
         else:
             new_dto_node.right_id = None
@@ -121,6 +100,6 @@ def __walk__(root_node: tree.Node, dto_nodes, dto_edges):
         dto_nodes.append(new_dto_node)
     
     
-    return dto_nodes, dto_edges
+    return dto_nodes
         
         
\ No newline at end of file
@@ -1,21 +1,50 @@
 from backend.models.decision_tree import DecisionTree
 from backend.models.decision_tree import Node
+from backend.models.regression_tree import RegressionTree
 from typing import Any
+import numpy as np
+
+def __counts_vector__(counts: dict[str, int] | None, position: dict[int, int]) -> np.ndarray | None:
+    """
+    Convert a {class: count} dict from the DTO back into a fixed-length count vector.
+    """
+    if counts is None:
+        return None
+    vector = np.zeros(len(position), dtype=np.int64)
+    for k, v in counts.items():
+        vector[position[int(k)]] = int(v)
+    return vector
 
 def tree_importer(tree: dict[str, Any]) -> DecisionTree:
     """
     tree: the JSON decoded dict (TreeResponseDTO.to_dict() output)
-    Returns: DecisionTree with internal Node links wired.
+    Returns: DecisionTree (RegressionTree for regression exports) with internal Node links wired.
     """
+    model_class = RegressionTree if tree.get("task") == "regression" else DecisionTree
 
     root_id_raw = tree.get("root_id")
     if root_id_raw is None:
-        return DecisionTree(root=None)
+        return model_class(root=None)
 
     root_id = int(root_id_raw)
 
     dto_nodes = tree.get("nodes", [])
 
+    # Class count vectors need a fixed length. Labels 0..k-1 index them directly;
+    # sparse or negative labels are mapped to positions, like DecisionTree.fit does
+    n_classes = len(tree.get("label_names") or [])
+    labels = set()
+    for n in dto_nodes:
+        labels.update(int(k) for k in (n.get("class_counts") or n.get("samples") or {}))
+    classes = None
+    if labels and (min(labels) < 0 or max(labels) >= max(n_classes, len(labels))):
+        classes = np.array(sorted(labels))
+        n_classes = len(classes)
+    else:
+        n_classes = max([n_classes] + [k + 1 for k in labels])
+    position = {k: i for i, k in enumerate(classes.tolist())} if classes is not None else \
+        {k: k for k in range(n_classes)}
+
     # 1) Create all Node objects
     nodes_by_id: dict[int, Node] = {}
     for n in dto_nodes:
@@ -26,9 +55,13 @@ def tree_importer(tree: dict[str, Any]) -> DecisionTree:
             threshold=n.get("threshold"),
             value=n.get("value"),
             IG=n.get("information_gain"),
-            samples=None,  
-            class_counts=n.get("class_counts"),
+            samples=n.get("n_samples"),
+            class_counts=__counts_vector__(n.get("class_counts") or n.get("samples"), position),
             predicted_class=n.get("predicted_class"),
+            categories=tuple(n["categories"]) if n.get("categories") is not None else None,
+            missing_left=n.get("missing_left"),
+            mean=n.get("mean"),
+            variance=n.get("variance"),
         )
 
     # 2) Wire children pointers
@@ -43,5 +76,8 @@ def tree_importer(tree: dict[str, Any]) -> DecisionTree:
         node.right = nodes_by_id[int(right_id)] if right_id is not None else None
 
     # 3) Create DecisionTree
-    return DecisionTree(root=nodes_by_id[root_id])
+    model = model_class(root=nodes_by_id[root_id])
+    model.n_classes = n_classes
+    model.classes = classes
+    return model
 
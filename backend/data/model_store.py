@@ -0,0 +1,323 @@
+"""
+Memory-mapped, versioned on-disk store for compiled decision trees.
+------------------------------------------------------
+Layout:
+
+    <root>/<model name>/v000001/meta.json
+                               /feature.npy, threshold.npy, ...   (FlatTree arrays)
+                               /information_gain.npy, samples.npy, class_counts.npy
+
+Every array is a plain .npy file opened with np.load(mmap_mode="r"), so each
+uvicorn worker maps the same page-cache pages read-only instead of holding its
+own copy, and opening a model only reads headers: O(1) in the tree size.
+A version is written to a temporary directory, synced to disk and published with
+a single atomic rename, so readers never see a partially written model.
+
+Each process keeps the most recently used models open (OPEN_CACHE_SIZE); an
+evicted model's maps, and their file descriptors, are closed once no request is
+still using it.
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+import numpy as np
+
+from backend.models.decision_tree import DecisionTree, Node
+from backend.models.flat_tree import FlatTree, LEAF, breadth_first
+
+STORE_DIR = os.environ.get("MODEL_STORE_DIR", "model_store")
+VERSION_PREFIX = "v"
+META_FILE = "meta.json"
+STATS_ARRAYS = ("information_gain", "samples", "class_counts")
+OPEN_CACHE_SIZE = 8   # Opened models kept per process; each holds one fd per array
+
+
+def _version_dir(version: int) -> str:
+    return f"{VERSION_PREFIX}{version:06d}"
+
+
+def _valid_name(name: str) -> bool:
+    return bool(name) and os.path.basename(name) == name and not name.startswith(".")
+
+
+def _check_name(name: str):
+    if not _valid_name(name):
+        raise ValueError(f"Invalid model name: {name!r}")
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class StoredModel:
+    """
+    A published model opened from the store. All arrays are read-only memory maps.
+
+    Attributes:
+        name (str): Model name.
+        version (int): Model version.
+        flat (FlatTree): Array-backed tree used for prediction.
+        information_gain (np.ndarray): IG per node (NaN where unset).
+        samples (np.ndarray): Samples per node (-1 where unset).
+        class_counts (np.ndarray): (nodes x classes) class distribution.
+        meta (dict): feature_names, label_names, confusion matrix and other metadata.
+        users (int): Requests currently using the model (guarded by the store lock).
+        evicted (bool): Dropped from the store's cache; closed when users reaches 0.
+    """
+    __slots__ = ("name", "version", "flat", "information_gain", "samples", "class_counts", "meta",
+                 "users", "evicted")
+
+    def __init__(self, name: str, version: int, flat: FlatTree,
+                 information_gain: np.ndarray, samples: np.ndarray,
+                 class_counts: np.ndarray, meta: dict):
+        self.name = name
+        self.version = version
+        self.flat = flat
+        self.information_gain = information_gain
+        self.samples = samples
+        self.class_counts = class_counts
+        self.meta = meta
+        self.users = 0
+        self.evicted = False
+
+    def close(self):
+        """
+        Unmap every array and release its file descriptor. The model must not be used afterwards.
+        """
+        arrays = [getattr(self.flat, a) for a in FlatTree.ARRAYS]
+        arrays += [self.information_gain, self.samples, self.class_counts]
+        for array in arrays:
+            mapping = getattr(array, "_mmap", None)
+            if mapping is not None:
+                mapping.close()
+
+    def to_tree(self) -> DecisionTree:
+        """
+        Rebuild a linked DecisionTree (e.g. for export_tree). O(nodes), unlike opening.
+        Returns:
+            DecisionTree: Tree equivalent to the stored one.
+        """
+        flat = self.flat
+        n = len(flat)
+        nodes = []
+        for i in range(n):
+            nid = int(flat.node_ids[i])
+            ig = float(self.information_gain[i])
+            samples = int(self.samples[i])
+            node = Node(id=nid if nid >= 0 else None,
+                        IG=None if np.isnan(ig) else ig,
+                        samples=None if samples < 0 else samples,
+                        class_counts=np.array(self.class_counts[i]) if self.class_counts.shape[1] else None,
+                        predicted_class=int(flat.value[i]))
+            if flat.feature[i] == LEAF:
+                node.value = int(flat.value[i])
+            else:
+                node.feature = int(flat.feature[i])
+                node.missing_left = bool(flat.missing_left[i])
+                if flat.cat_index[i] != LEAF:
+                    node.categories = tuple(int(c) for c in np.flatnonzero(flat.cat_table[flat.cat_index[i]]))
+                else:
+                    node.threshold = float(flat.threshold[i])
+            nodes.append(node)
+        for i in np.flatnonzero(flat.feature != LEAF).tolist():
+            nodes[i].left = nodes[int(flat.left[i])]
+            nodes[i].right = nodes[int(flat.right[i])]
+        tree = DecisionTree(root=nodes[0] if nodes else None)
+        tree.n_classes = self.class_counts.shape[1] or None
+        if self.meta.get("classes") is not None:
+            tree.classes = np.array(self.meta["classes"])
+        return tree
+
+
+class ModelStore:
+    """
+    Versioned model store rooted at a directory shared by all worker processes.
+
+    Attributes:
+        root (str): Store directory.
+    """
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self.opened: OrderedDict[tuple[str, int], StoredModel] = OrderedDict()  # Per-process LRU of open maps
+        self.lock = threading.Lock()
+
+    def list_models(self) -> list[str]:
+        """
+        List the names of all models with at least one published version.
+        Returns:
+            list[str]: Model names, sorted.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if _valid_name(name) and self.list_versions(name))
+
+    def list_versions(self, name: str) -> list[int]:
+        """
+        List the published versions of a model.
+        Args:
+            name (str): Model name.
+        Returns:
+            list[int]: Versions in ascending order (empty if the model does not exist).
+        """
+        _check_name(name)
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        versions = []
+        for entry in os.listdir(model_dir):
+            if entry.startswith(VERSION_PREFIX) and entry[len(VERSION_PREFIX):].isdigit():
+                versions.append(int(entry[len(VERSION_PREFIX):]))
+        return sorted(versions)
+
+    def publish(self,
+                name: str,
+                tree: DecisionTree,
+                feature_names: list[str] | None = None,
+                label_names: list[str] | None = None,
+                confusion_matrix=None,
+                confusion_matrix_metadata=None) -> int:
+        """
+        Write a tree as a new version of a model and publish it atomically.
+        Args:
+            name (str): Model name (a single path component).
+            tree (DecisionTree): Trained or imported tree.
+            feature_names (list[str], optional): Feature names for the dashboard.
+            label_names (list[str], optional): Class names for the dashboard.
+            confusion_matrix (optional): Confusion matrix for the dashboard.
+            confusion_matrix_metadata (optional): Confusion matrix metadata.
+        Returns:
+            int: The new version number.
+        """
+        _check_name(name)
+        model_dir = os.path.join(self.root, name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=model_dir)
+        try:
+            n_nodes = self.__write_arrays__(staging, tree)
+            meta = {
+                "name": name,
+                "n_nodes": n_nodes,
+                "feature_names": [str(f) for f in (feature_names if feature_names is not None else [])],
+                "label_names": [str(label) for label in (label_names if label_names is not None else [])],
+                "confusion_matrix": None if confusion_matrix is None else np.asarray(confusion_matrix).tolist(),
+                "confusion_matrix_metadata": confusion_matrix_metadata,
+                "classes": None if tree.classes is None else np.asarray(tree.classes).tolist(),
+            }
+            while True:
+                version = (self.list_versions(name) or [0])[-1] + 1
+                meta["version"] = version
+                with open(os.path.join(staging, META_FILE), "w") as f:
+                    json.dump(meta, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Make the files and their directory entries durable before the rename makes them visible
+                _fsync_dir(staging)
+                try:
+                    # Atomic on POSIX; fails if another process took this version first
+                    os.rename(staging, os.path.join(model_dir, _version_dir(version)))
+                    _fsync_dir(model_dir)
+                    return version
+                except OSError:
+                    if not os.path.isdir(os.path.join(model_dir, _version_dir(version))):
+                        raise
+        finally:
+            if os.path.isdir(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+
+    @contextmanager
+    def load(self, name: str, version: int | None = None) -> Iterator[StoredModel]:
+        """
+        Open a published model for the duration of a `with` block. Arrays are memory-mapped,
+        so this is O(1) in tree size, and repeated loads in the same process reuse the open
+        maps of the OPEN_CACHE_SIZE most recently used models.
+        Args:
+            name (str): Model name.
+            version (int, optional): Version to open. Defaults to the latest.
+        Returns:
+            Iterator[StoredModel]: The opened model; its maps may be closed after the block exits.
+        """
+        _check_name(name)
+        if version is None:
+            versions = self.list_versions(name)
+            if not versions:
+                raise KeyError(f"No published versions of model {name!r}")
+            version = versions[-1]
+        key = (name, int(version))
+        with self.lock:
+            model = self.opened.get(key)
+            if model is None:
+                model = self.__open__(name, int(version))
+                self.opened[key] = model
+                if len(self.opened) > OPEN_CACHE_SIZE:
+                    _, evicted = self.opened.popitem(last=False)
+                    evicted.evicted = True
+                    if not evicted.users:
+                        evicted.close()
+            else:
+                self.opened.move_to_end(key)
+            model.users += 1
+        try:
+            yield model
+        finally:
+            with self.lock:
+                model.users -= 1
+                if model.evicted and not model.users:
+                    model.close()
+
+    def __open__(self, name: str, version: int) -> StoredModel:
+        path = os.path.join(self.root, name, _version_dir(version))
+        if not os.path.isdir(path):
+            raise KeyError(f"Model {name!r} has no version {version}")
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+
+        def mapped(array_name):
+            return np.load(os.path.join(path, f"{array_name}.npy"), mmap_mode="r")
+
+        flat = FlatTree(*(mapped(a) for a in FlatTree.ARRAYS))
+        stats = [mapped(a) for a in STATS_ARRAYS]
+        return StoredModel(name, version, flat, *stats, meta)
+
+    def __write_arrays__(self, path: str, tree: DecisionTree) -> int:
+        if tree.root is None:
+            raise ValueError("Cannot publish an empty tree")
+        if tree.task != "classification":
+            raise ValueError(f"Only classification trees can be published, not {tree.task}")
+        flat = FlatTree.from_tree(tree)
+        for array_name in FlatTree.ARRAYS:
+            np.save(os.path.join(path, f"{array_name}.npy"), getattr(flat, array_name))
+
+        order, _ = breadth_first(tree.root)
+        n_classes = max([tree.n_classes or 0] + [len(n.class_counts) for n in order if n.class_counts is not None])
+        information_gain = np.full(len(order), np.nan)
+        samples = np.full(len(order), -1, dtype=np.int64)
+        class_counts = np.zeros((len(order), n_classes), dtype=np.int64)
+        for i, node in enumerate(order):
+            if node.IG is not None:
+                information_gain[i] = node.IG
+            if node.class_counts is not None:
+                class_counts[i, :len(node.class_counts)] = node.class_counts
+                samples[i] = int(np.sum(node.class_counts))
+            elif node.samples is not None:
+                samples[i] = node.samples
+        for array_name, array in zip(STATS_ARRAYS, (information_gain, samples, class_counts)):
+            np.save(os.path.join(path, f"{array_name}.npy"), array)
+        # Flush the arrays; publish() syncs meta.json and the directory entries
+        for entry in os.listdir(path):
+            with open(os.path.join(path, entry), "rb") as f:
+                os.fsync(f.fileno())
+        return len(order)
+
+
+model_store = ModelStore()
@@ -0,0 +1,98 @@
+"""
+Code generation backend for DecisionTree prediction.
+------------------------------------------------------
+Compiles a trained tree into Python source made of nested `if x[f] <= t:` blocks
+(`if x[f] in (...)` for categorical splits, plus `or x[f] != x[f]` when missing
+values go left), where every leaf returns its class and root-to-leaf path as
+constants. The source is exec'd once, so a prediction costs one comparison per
+level and nothing else.
+"""
+from __future__ import annotations
+from typing import Callable
+import numpy as np
+
+
+MAX_CODEGEN_NODES = 20_000   # Larger trees generate too much source to be worth compiling
+MAX_CODEGEN_DEPTH = 90       # CPython rejects more than 100 levels of nested blocks
+FUNCTION_NAME = "predict_one"
+
+
+def generate_source(tree,
+                    max_nodes: int = MAX_CODEGEN_NODES,
+                    max_depth: int = MAX_CODEGEN_DEPTH) -> str:
+    """
+    Generate the Python source of a specialised predict function for a tree.
+    Args:
+        tree (DecisionTree): Trained or imported tree with a root Node.
+        max_nodes (int): Refuse trees with more nodes than this.
+        max_depth (int): Refuse trees deeper than this.
+    Returns:
+        str: Source defining `predict_one(x) -> (class, path_tuple)`.
+    """
+    if tree.root is None:
+        raise ValueError("Cannot compile an empty tree")
+
+    lines = [f"def {FUNCTION_NAME}(x):"]
+    n_nodes = 0
+    # Explicit stack of (node, depth, path so far, line to emit before the node)
+    stack = [(tree.root, 0, (), None)]
+    while stack:
+        node, depth, path, header = stack.pop()
+        n_nodes += 1
+        if n_nodes > max_nodes:
+            raise ValueError(f"Tree has more than {max_nodes} nodes; too large to compile")
+        if depth > max_depth:
+            raise ValueError(f"Tree is deeper than {max_depth}; too deep to compile")
+
+        indent = "    " * (depth + 1)
+        if header is not None:
+            lines.append("    " * depth + header)
+        path = path + (node.id,)
+        if node.is_leaf():
+            lines.append(f"{indent}return {_leaf_value(node)!r}, {path!r}")
+            continue
+        # Right is pushed first so the left branch is emitted first
+        stack.append((node.right, depth + 1, path, "else:"))
+        stack.append((node.left, depth + 1, path, f"if {_condition(node)}:"))
+    return "\n".join(lines) + "\n"
+
+
+def _leaf_value(node):
+    """
+    Leaf prediction as a plain Python constant: class label, or value for regression trees.
+    """
+    if isinstance(node.value, (float, np.floating)):
+        return float(node.value)
+    return int(node.value)
+
+
+def _condition(node) -> str:
+    """
+    Source of the test that sends a value down the left branch of a split node.
+    """
+    value = f"x[{int(node.feature)}]"
+    if node.categories is not None:
+        test = f"{value} in {tuple(int(c) for c in node.categories)!r}"
+    else:
+        test = f"{value} <= {float(node.threshold)!r}"
+    if node.missing_left:
+        test = f"{test} or {value} != {value}"
+    return test
+
+
+def compile_tree(tree,
+                 max_nodes: int = MAX_CODEGEN_NODES,
+                 max_depth: int = MAX_CODEGEN_DEPTH) -> Callable:
+    """
+    Generate and exec the specialised predict function for a tree.
+    Args:
+        tree (DecisionTree): Trained or imported tree with a root Node.
+        max_nodes (int): Refuse trees with more nodes than this.
+        max_depth (int): Refuse trees deeper than this.
+    Returns:
+        Callable: Function mapping a feature vector to (class, path_tuple).
+    """
+    source = generate_source(tree, max_nodes, max_depth)
+    namespace = {}
+    exec(compile(source, "<decision_tree>", "exec"), {"inf": float("inf"), "nan": float("nan")}, namespace)
+    return namespace[FUNCTION_NAME]
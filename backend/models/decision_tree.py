@@ -8,20 +8,80 @@ and information gain. Designed for educational and demonstration purposes, it pr
 and is easily extensible for research or production adaptation.
 """
 from __future__ import annotations
+import heapq
+import itertools
+import time
 import numpy as np
+from backend.models import codegen
 
 
 
 # Tree growth hyperparameters
 MAX_DEPTH = 3              # Maximum depth allowed for the tree
 MIN_SAMPLES_PER_LEAF = 2   # Minimum number of samples required to form a leaf node
+MIN_INFORMATION_GAIN = 0.1 # Splits with information gain at or below this become leaves
+
+
+def _entropy_rows(counts: np.ndarray) -> np.ndarray:
+    """
+    Entropy of every row of a (candidates x classes) count matrix.
+    Args:
+        counts (np.ndarray): Class counts, one row per candidate split side.
+    Returns:
+        np.ndarray: Entropy per row (0 for empty rows).
+    """
+    totals = counts.sum(axis=1, keepdims=True)
+    p = counts / np.where(totals == 0, 1, totals)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plogp = np.where(p > 0, p * np.log2(p), 0.0)
+    return -plogp.sum(axis=1)
+
+
+def _information_gain(left_counts: np.ndarray, right_counts: np.ndarray, dataset_entropy: float) -> np.ndarray:
+    """
+    Information gain of every candidate split given its left/right class counts.
+    Args:
+        left_counts (np.ndarray): Class counts sent left, one row per candidate.
+        right_counts (np.ndarray): Class counts sent right, one row per candidate.
+        dataset_entropy (float): Entropy of the node being split.
+    Returns:
+        np.ndarray: Information gain per candidate.
+    """
+    n_left = left_counts.sum(axis=1)
+    n_right = right_counts.sum(axis=1)
+    total = n_left + n_right
+    weighted_entropy = (n_left / total) * _entropy_rows(left_counts) + (n_right / total) * _entropy_rows(right_counts)
+    return dataset_entropy - weighted_entropy
+
+
+def _best_missing_direction(left_counts: np.ndarray,
+                            right_counts: np.ndarray,
+                            missing_counts: np.ndarray,
+                            dataset_entropy: float):
+    """
+    Score each candidate split with the missing-value rows sent left and right.
+    Without missing rows, missing values default to the larger child.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (information_gain, missing_left) per candidate.
+    """
+    if not missing_counts.any():
+        ig = _information_gain(left_counts, right_counts, dataset_entropy)
+        return ig, left_counts.sum(axis=1) >= right_counts.sum(axis=1)
+    ig_left = _information_gain(left_counts + missing_counts, right_counts, dataset_entropy)
+    ig_right = _information_gain(left_counts, right_counts + missing_counts, dataset_entropy)
+    return np.maximum(ig_left, ig_right), ig_left >= ig_right
 
 
 class Node:
     """
     Represents a node in the decision tree.
     Internal nodes store splitting criteria; leaf nodes store prediction results.
+    Uses __slots__ so large trees don't pay for a per-node __dict__.
     """
+    __slots__ = ("id", "feature", "threshold", "left", "right", "value",
+                 "IG", "samples", "class_counts", "predicted_class",
+                 "categories", "missing_left", "mean", "variance")
+
     def __init__(self, 
                  id : int | None = None,
                  feature : int | None = None, 
@@ -31,8 +91,12 @@ class Node:
                  value : int | None = None, 
                  IG : float | None = None,
                  samples : int | None = None,
-                 class_counts : dict[int, int] | None = None,
-                 predicted_class: int | None = None 
+                 class_counts : np.ndarray | None = None,
+                 predicted_class: int | None = None,
+                 categories: tuple | None = None,
+                 missing_left: bool | None = None,
+                 mean: float | None = None,
+                 variance: float | None = None
         ):
         self.id = id                # Set by Frontend
         self.feature = feature      # Feature index used for splitting (None for leaf)
@@ -42,8 +106,12 @@ class Node:
         self.value = value          # Predicted class label (for leaf nodes)
         self.IG = IG                # Information gain for the split
         self.samples = samples      # Number of samples at this node
-        self.class_counts = class_counts  # Class distribution at this node
+        self.class_counts = class_counts  # Class distribution at this node (counts indexed by class label)
         self.predicted_class = predicted_class  # Predicted class at this node
+        self.categories = categories  # Category codes sent left (categorical splits only)
+        self.missing_left = missing_left  # Whether missing (NaN) values go left (None = right)
+        self.mean = mean            # Mean target at this node (regression trees only)
+        self.variance = variance    # Target variance at this node (regression trees only)
 
     def is_leaf(self):
         """
@@ -61,11 +129,16 @@ class DecisionTree:
     Utilizes entropy and information gain to determine optimal splits.
     Provides methods for training and prediction.
     """
+    task = "classification"
 
     def __init__(self, 
                  max_depth: int | None = None,
                  min_samples_per_leaf: int | None = None,
-                 root: Node | None = None
+                 root: Node | None = None,
+                 categorical_features: list[int] | None = None,
+                 max_leaf_nodes: int | None = None,
+                 time_budget_s: float | None = None,
+                 min_information_gain: float | None = None
                  ):
         """
         Initialize the DecisionTree classifier.
@@ -73,10 +146,24 @@ class DecisionTree:
             max_depth (int, optional): Maximum depth of the tree. Defaults to MAX_DEPTH.
             min_samples_per_leaf (int, optional): Minimum samples required per leaf. Defaults to MIN_SAMPLES_PER_LEAF.
             root (Node, optional): Root node of the tree. Used for deserialization or custom trees.
+            categorical_features (list[int], optional): Indices of features holding non-negative
+                integer category codes, split natively by category set instead of threshold.
+            max_leaf_nodes (int, optional): Stop growing once the tree has this many leaves. Defaults to no limit.
+            time_budget_s (float, optional): Wall-clock budget for fit(); growth stops after it runs out
+                and the tree grown so far is kept. Checked between node evaluations. Defaults to no limit.
+            min_information_gain (float, optional): Splits at or below this (unweighted) gain become leaves.
+                Defaults to MIN_INFORMATION_GAIN.
         """
         self.root = root  # Root node of the tree
         self.max_depth = max_depth if max_depth is not None else MAX_DEPTH
         self.min_samples_per_leaf = min_samples_per_leaf if min_samples_per_leaf is not None else MIN_SAMPLES_PER_LEAF
+        self.n_classes = None  # Length of every node's class_counts vector, set by fit()
+        self.classes = None  # Label of each class_counts index, set by fit() (None = the index itself)
+        self.compiled_predict = None  # Generated predict function, set by compile()
+        self.categorical_features = frozenset(categorical_features or ())  # Features split by category set
+        self.max_leaf_nodes = max_leaf_nodes
+        self.time_budget_s = time_budget_s
+        self.min_information_gain = min_information_gain if min_information_gain is not None else MIN_INFORMATION_GAIN
 
     def calculate_entropy(self, labels : np.ndarray):
         """
@@ -97,60 +184,126 @@ class DecisionTree:
                             features : np.ndarray, 
                             labels : np.ndarray):
         """
-        Identify the optimal feature and threshold for splitting, maximizing information gain.
+        Identify the optimal feature and split for splitting, maximizing information gain.
+        Numeric features split on `x <= threshold`; features listed in categorical_features
+        split on membership of a category set. NaN marks a missing value and is routed
+        to whichever side gives the higher information gain.
         Args:
             features (np.ndarray): Feature matrix (samples x features).
             labels (np.ndarray): Class labels.
         Returns:
-            tuple: (best_threshold, best_feature_index, max_information_gain)
+            tuple: (best_threshold, best_feature_index, max_information_gain, categories, missing_left)
+                where categories is the tuple of category codes sent left (None for numeric splits).
         """
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels, dtype=np.intp)
+        n_classes = self.n_classes if self.n_classes is not None else int(labels.max()) + 1
         dataset_entropy = self.calculate_entropy(labels)
-        IG = []
-        thresholds = []
-        features = np.array(features)
-        for feature in range(len(features[0])):
-            features_sorted = np.sort(features[:, feature])
-            features_unique = np.unique(features_sorted)
-            feature_thresholds = []
-            IG_per_feature = []
-            for i in range(len(features_unique) - 1):
-                left, right = features_unique[i], features_unique[i + 1]
-                feature_threshold = (left + right) / 2
-                feature_thresholds.append(feature_threshold)
-                labels_left = []
-                labels_right = []
-                for j in range(len(features)):
-                    if features[j][feature] <= feature_threshold:
-                        labels_left.append(labels[j])
-                    else:
-                        labels_right.append(labels[j])
-                # Calculate Information Gain
-                left_entropy = self.calculate_entropy(labels_left)
-                right_entropy = self.calculate_entropy(labels_right)
-                len_labels_left = len(labels_left)
-                len_labels_right = len(labels_right)
-                total_labels = len_labels_left + len_labels_right
-                weighted_entropy_left = (len_labels_left / total_labels) * left_entropy
-                weighted_entropy_right = (len_labels_right / total_labels) * right_entropy
-                weighted_entropy = weighted_entropy_left + weighted_entropy_right
-                ig = dataset_entropy - weighted_entropy
-                IG_per_feature.append(ig)
-            max_info_gain = max(IG_per_feature)
-            IG.append(max_info_gain)
-            index_of_max_IG = IG_per_feature.index(max_info_gain)
-            threshold = feature_thresholds[index_of_max_IG]
-            thresholds.append(threshold)
-        max_IG = max(IG)
-        index_of_max_IG = IG.index(max_IG)
-        max_threshold = thresholds[index_of_max_IG]
-        feature_to_split = index_of_max_IG
-        return max_threshold, feature_to_split, max_IG
+
+        best = (None, None, -np.inf, None, True)
+        for feature in range(features.shape[1]):
+            column = features[:, feature]
+            if feature in self.categorical_features:
+                candidate = self.__categorical_split__(column, labels, n_classes, dataset_entropy)
+            else:
+                candidate = self.__numeric_split__(column, labels, n_classes, dataset_entropy)
+            if candidate is None:
+                continue
+            threshold, ig, categories, missing_left = candidate
+            if ig > best[2]:
+                best = (threshold, feature, ig, categories, missing_left)
+
+        if best[1] is None:
+            # No feature has two distinct values: nothing to split on
+            return None, None, 0.0, None, True
+        return best
+
+    def __numeric_split__(self, column, labels, n_classes, dataset_entropy):
+        """
+        Evaluate every midpoint threshold of a numeric feature in one pass using
+        prefix sums of class counts over the sorted values.
+        Returns:
+            tuple | None: (threshold, information_gain, None, missing_left), or None if the
+                feature has fewer than two distinct values.
+        """
+        present = ~np.isnan(column)
+        values = column[present]
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        unique = np.unique(values)
+        if len(unique) < 2:
+            return None
+
+        thresholds = (unique[:-1] + unique[1:]) / 2
+        prefix = np.cumsum(np.eye(n_classes, dtype=np.int64)[labels[present][order]], axis=0)
+        n_left = np.searchsorted(values, thresholds, side="right")
+        left_counts = prefix[n_left - 1]
+        right_counts = prefix[-1] - left_counts
+        missing_counts = np.bincount(labels[~present], minlength=n_classes)
+
+        ig, missing_left = _best_missing_direction(left_counts, right_counts, missing_counts, dataset_entropy)
+        best = int(np.argmax(ig))
+        return thresholds[best], ig[best], None, bool(missing_left[best])
+
+    def __categorical_split__(self, column, labels, n_classes, dataset_entropy):
+        """
+        Evaluate k-1 category partitions instead of 2^k: categories are ordered by the
+        share of the node's majority class and each prefix of that order is a candidate
+        left set (exact for two classes, a standard heuristic otherwise).
+        Returns:
+            tuple | None: (None, information_gain, categories, missing_left), or None if the
+                feature has fewer than two distinct categories.
+        """
+        present = ~np.isnan(column)
+        codes = column[present].astype(np.intp)
+        categories, inverse = np.unique(codes, return_inverse=True)
+        if len(categories) < 2:
+            return None
+
+        counts = np.zeros((len(categories), n_classes), dtype=np.int64)
+        np.add.at(counts, (inverse, labels[present]), 1)
+        majority = int(np.argmax(counts.sum(axis=0)))
+        share = counts[:, majority] / counts.sum(axis=1)
+        order = np.argsort(share, kind="stable")
+
+        prefix = np.cumsum(counts[order], axis=0)
+        left_counts = prefix[:-1]
+        right_counts = prefix[-1] - left_counts
+        missing_counts = np.bincount(labels[~present], minlength=n_classes)
+
+        ig, missing_left = _best_missing_direction(left_counts, right_counts, missing_counts, dataset_entropy)
+        best = int(np.argmax(ig))
+        left_set = tuple(int(c) for c in np.sort(categories[order[:best + 1]]))
+        return None, ig[best], left_set, bool(missing_left[best])
+
+    @staticmethod
+    def goes_left(value: float,
+                  threshold: float | None,
+                  categories: tuple | None,
+                  missing_left: bool | None) -> bool:
+        """
+        Decide which branch a single feature value follows.
+        Args:
+            value (float): Feature value (NaN for missing).
+            threshold (float | None): Numeric threshold.
+            categories (tuple | None): Category codes sent left (categorical splits).
+            missing_left (bool | None): Whether missing values go left (None = right).
+        Returns:
+            bool: True for the left branch.
+        """
+        if value != value:  # NaN
+            return bool(missing_left)
+        if categories is not None:
+            return value in categories
+        return value <= threshold
 
     def split(self, 
               features : np.ndarray, 
               feature_to_split_on : int, 
               threshold : float, 
-              labels : np.ndarray):
+              labels : np.ndarray,
+              categories : tuple | None = None,
+              missing_left : bool | None = None):
         """
         Partition the dataset into left and right branches using a feature and threshold.
         Args:
@@ -158,22 +311,20 @@ class DecisionTree:
             feature_to_split_on (int): Index of the feature to split on.
             threshold (float): Threshold value for the split.
             labels (np.ndarray): Class labels.
+            categories (tuple, optional): Category codes sent left, for categorical splits.
+            missing_left (bool, optional): Whether missing (NaN) values go left.
         Returns:
             tuple: (left_features, right_features, left_labels, right_labels)
         """
-        left_features = []
-        right_features = []
-        left_labels = []
-        right_labels = []
-        for i in range(len(features)):
-            feature = features[i][feature_to_split_on]
-            if feature <= threshold:
-                left_features.append(features[i])
-                left_labels.append(labels[i])
-            else:
-                right_features.append(features[i])
-                right_labels.append(labels[i])
-        return left_features, right_features, left_labels, right_labels
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels)
+        column = features[:, feature_to_split_on]
+        if categories is not None:
+            go_left = np.isin(column, categories)
+        else:
+            go_left = column <= threshold
+        go_left = np.where(np.isnan(column), bool(missing_left), go_left)
+        return features[go_left], features[~go_left], labels[go_left], labels[~go_left]
 
     @staticmethod
     def stopping_criteria(labels: np.ndarray, 
@@ -198,23 +349,41 @@ class DecisionTree:
         """
         Train the decision tree using the provided features and labels.
         Args:
-            features (np.ndarray): Feature matrix (samples x features).
-            labels (np.ndarray): Class labels.
+            features (np.ndarray): Feature matrix (samples x features). NaN marks a missing value.
+            labels (np.ndarray): Class labels (any integers; encoded internally as 0..k-1).
         """
+        features = np.asarray(features, dtype=np.float64)
+        self.__check_categorical__(features)
+        # Class counts are indexed by class position, so sparse or negative labels don't blow them up
+        classes, encoded = np.unique(np.asarray(labels), return_inverse=True)
+        self.classes = None if np.array_equal(classes, np.arange(len(classes))) else classes
+        self.n_classes = len(classes)
+        self.compiled_predict = None
         root = Node()
         self.root = root
-        self.root = self.__build__(self.root, features, labels)
+        self.root = self.__build__(self.root, features, encoded.ravel())
+
+    def __check_categorical__(self, features: np.ndarray):
+        """
+        Reject categorical columns that do not hold non-negative integer codes (NaN allowed).
+        Args:
+            features (np.ndarray): Feature matrix.
+        """
+        for feature in self.categorical_features:
+            codes = features[:, feature]
+            codes = codes[~np.isnan(codes)]
+            if np.any(codes < 0) or np.any(codes != np.floor(codes)):
+                raise ValueError(f"Categorical feature {feature} must hold non-negative integer codes")
         
-    def __class_count__(self, labels: np.ndarray) -> dict[int, int]:
+    def __class_count__(self, labels: np.ndarray) -> np.ndarray:
         """
         Count the occurrences of each class label in the dataset.
         Args:
-            labels (np.ndarray): Array of class labels.
+            labels (np.ndarray): Array of encoded class labels (0..n_classes-1).
         Returns:
-            dict[int, int]: Mapping from class label to count.
+            np.ndarray: Fixed-length count vector where index i holds the count of class_label(i).
         """
-        values, counts = np.unique(labels, return_counts=True)
-        return dict(zip(values, counts))
+        return np.bincount(np.asarray(labels, dtype=np.intp), minlength=self.n_classes)
 
 
     def __build__(self, 
@@ -223,65 +392,138 @@ class DecisionTree:
                   labels : np.ndarray, 
                   depth : int = 0):
         """
-        Recursively construct the decision tree structure.
+        Construct the decision tree structure best-first: a priority queue holds every
+        splittable leaf keyed by its weighted impurity decrease (IG * samples, as in
+        sklearn's best-first builder), and the leaf that removes the most impurity from
+        the whole tree is always expanded next. Growth stops when the queue is empty, max_leaf_nodes is
+        reached, or time_budget_s runs out; leaves still queued keep their majority class,
+        so an interrupted fit returns the best tree found so far.
+        Iterative, so tree depth is not bounded by Python's recursion limit.
         Args:
-            node (Node): Current node.
+            node (Node): Root node to grow.
             features (np.ndarray): Feature matrix.
             labels (np.ndarray): Class labels.
-            depth (int): Current depth in the tree.
+            depth (int): Depth of `node` in the tree.
         Returns:
-            Node: The constructed node (leaf or internal).
+            Node: The constructed root node (leaf or internal).
+        """
+        deadline = None if self.time_budget_s is None else time.perf_counter() + self.time_budget_s
+        order = itertools.count()  # Tie-breaker: equal priorities expand in creation order
+        queue = []
+        n_leaves = 1
+
+        candidate = self.__prepare_split__(node, features, labels, depth)
+        if candidate is not None:
+            heapq.heappush(queue, (-candidate[0] * candidate[1].samples, next(order), candidate))
+
+        while queue:
+            if self.max_leaf_nodes is not None and n_leaves >= self.max_leaf_nodes:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            _, _, (IG, parent, parent_depth, split_params, children) = heapq.heappop(queue)
+            parent.threshold, parent.feature, parent.categories, parent.missing_left = split_params
+            parent.IG = IG
+            n_leaves += 1
+
+            left_feature, right_feature, left_labels, right_labels = children
+            parent.left = Node()
+            parent.right = Node()
+            for child, child_features, child_labels in ((parent.left, left_feature, left_labels),
+                                                        (parent.right, right_feature, right_labels)):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self.__make_leaf__(child, child_labels)
+                    continue
+                candidate = self.__prepare_split__(child, child_features, child_labels, parent_depth + 1)
+                if candidate is not None:
+                    heapq.heappush(queue, (-candidate[0] * candidate[1].samples, next(order), candidate))
+
+        # Whatever is still queued stays a leaf
+        for _, _, (IG, leaf, _depth, _split, children) in queue:
+            self.__make_leaf__(leaf, np.concatenate((children[2], children[3])))
+            leaf.IG = IG
+        return node
+
+    def __make_leaf__(self, node: Node, labels: np.ndarray):
+        """
+        Turn a node into a leaf predicting the majority class of its labels.
+        Args:
+            node (Node): Node to finalize.
+            labels (np.ndarray): Class labels reaching the node.
+        """
+        self.__node_stats__(node, labels)
+        node.value = node.predicted_class
+
+    def __node_stats__(self, node: Node, labels: np.ndarray):
+        """
+        Record the sample count, class distribution and majority class of a node.
+        Args:
+            node (Node): Node to annotate.
+            labels (np.ndarray): Class labels reaching the node.
+        """
+        node.samples = len(labels)
+        node.class_counts = self.__class_count__(labels)
+        node.predicted_class = self.class_label(int(np.argmax(node.class_counts)))
+
+    def class_label(self, index: int):
+        """
+        Map a class_counts index back to the original class label.
+        Args:
+            index (int): Position in a class_counts vector.
+        Returns:
+            int: Class label.
+        """
+        return index if self.classes is None else self.classes[index].item()
+
+    def __prepare_split__(self,
+                          node: Node,
+                          features: np.ndarray,
+                          labels: np.ndarray,
+                          depth: int):
+        """
+        Fill in a new node's statistics and find its best split. Nodes that cannot or
+        should not be split are finalized as leaves.
+        Args:
+            node (Node): Node to evaluate.
+            features (np.ndarray): Feature matrix reaching the node.
+            labels (np.ndarray): Class labels reaching the node.
+            depth (int): Depth of the node in the tree.
+        Returns:
+            tuple | None: (IG, node, depth, (threshold, feature, categories, missing_left),
+                (left_features, right_features, left_labels, right_labels)), or None for a leaf.
         """
         if DecisionTree.stopping_criteria(labels, depth, self.max_depth):
             # Assign the majority class as the value for the leaf node
-            node.class_counts = self.__class_count__(labels)
-            node.value = max(node.class_counts, key=node.class_counts.get)
-            node.samples = len(labels)
-            node.predicted_class = max(node.class_counts, key=node.class_counts.get)
-            return node
+            self.__make_leaf__(node, labels)
+            return None
 
-        threshold, feature_to_split_on, IG = self.determine_threshold(features, labels)
+        threshold, feature_to_split_on, IG, categories, missing_left = self.determine_threshold(features, labels)
         
-        if IG <= 0.1:
+        if IG <= self.min_information_gain:
             # If information gain is too low, make this a leaf node
-            node.class_counts = self.__class_count__(labels)
-            node.value = max(node.class_counts, key=node.class_counts.get)
-            node.samples = len(labels)
-            node.predicted_class = max(node.class_counts, key=node.class_counts.get)
+            self.__make_leaf__(node, labels)
             node.IG = IG
-            return node
+            return None
         
-        left_feature, right_feature, left_labels, right_labels = self.split(features, feature_to_split_on, threshold, labels)
+        children = self.split(features, feature_to_split_on, threshold, labels, categories, missing_left)
+        left_labels, right_labels = children[2], children[3]
         
         if len(left_labels) < self.min_samples_per_leaf or len(right_labels) < self.min_samples_per_leaf:
             # If a split would result in a leaf with too few samples, make this a leaf node
-            node.class_counts = self.__class_count__(labels)
-            node.value = max(node.class_counts, key=node.class_counts.get)
-            node.samples = len(labels)
-            node.predicted_class = max(node.class_counts, key=node.class_counts.get)
+            self.__make_leaf__(node, labels)
             node.IG = IG
-            return node
-        
-        node.feature = feature_to_split_on
-        node.threshold = threshold
-        node.IG = IG
-        node.samples = len(labels)
-        node.class_counts = self.__class_count__(labels)
-        node.predicted_class = max(node.class_counts, key=node.class_counts.get)
-        
-        left_node = Node()
-        right_node = Node()
+            return None
         
-        node.left = self.__build__(left_node, left_feature, left_labels, depth + 1)
-        node.right = self.__build__(right_node, right_feature, right_labels, depth + 1)
-        return node
+        # Stays a leaf-in-waiting until expanded
+        self.__node_stats__(node, labels)
+        return IG, node, depth, (threshold, feature_to_split_on, categories, missing_left), children
 
     def __traverse__(self, 
                      node : Node, 
                      x : np.ndarray,
                      path : list):
         """
-        Traverse the tree to predict the class label for a single sample.
+        Walk the tree from `node` to predict the class label for a single sample.
         Args:
             node (Node): Current node in the tree.
             x (np.ndarray): Feature vector for a single sample.
@@ -289,15 +531,16 @@ class DecisionTree:
         Returns:
             int: Predicted class label.
         """
-        path.append(node.id if node.id is not None else None)
-        if node.is_leaf():
-            return node.value, path
-        if x[node.feature] <= node.threshold:
-            # Traverse left subtree
-            return self.__traverse__(node.left, x, path)
-        else:
-            # Traverse right subtree
-            return self.__traverse__(node.right, x, path)
+        while True:
+            path.append(node.id if node.id is not None else None)
+            if node.is_leaf():
+                return node.value, path
+            if DecisionTree.goes_left(x[node.feature], node.threshold, node.categories, node.missing_left):
+                # Traverse left subtree
+                node = node.left
+            else:
+                # Traverse right subtree
+                node = node.right
 
     def predict(self, X : np.ndarray):
         """
@@ -322,8 +565,24 @@ class DecisionTree:
             int: Predicted class label.
             list: Path for prediction.
         """
+        if self.compiled_predict is not None:
+            pred, path = self.compiled_predict(x)
+            return pred, list(path)
         path = []
         return self.__traverse__(self.root, x, path)
 
+    def compile(self, max_nodes: int | None = None):
+        """
+        Compile the tree into a generated Python predict function, used by predict_one
+        until the tree is refit. Raises ValueError if the tree is too large to compile.
+        Args:
+            max_nodes (int, optional): Node limit. Defaults to codegen.MAX_CODEGEN_NODES.
+        Returns:
+            DecisionTree: self, for chaining.
+        """
+        limit = max_nodes if max_nodes is not None else codegen.MAX_CODEGEN_NODES
+        self.compiled_predict = codegen.compile_tree(self, max_nodes=limit)
+        return self
+
         
         
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Flat-array representation of a trained DecisionTree.
+------------------------------------------------------
+The linked Node graph is compiled into parallel NumPy arrays (struct-of-arrays),
+indexed in breadth-first order with the root at index 0. Batch prediction walks
+every row down the tree one level at a time with vectorized array indexing.
+"""
+from __future__ import annotations
+from collections import deque
+import numpy as np
+
+
+LEAF = -1  # Marker stored in `feature` / `left` / `right` for leaf nodes
+
+
+def breadth_first(root) -> tuple[list, dict]:
+    """
+    List the nodes of a tree in breadth-first order (the FlatTree index order).
+    Args:
+        root (Node): Root node.
+    Returns:
+        tuple[list[Node], dict[Node, int]]: Nodes in order and each node's index.
+    """
+    order = []
+    index = {root: 0}
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for child in (node.left, node.right):
+            if child is not None and child not in index:
+                index[child] = len(index)
+                queue.append(child)
+    return order, index
+
+
+class FlatTree:
+    """
+    Decision tree stored as parallel arrays.
+
+    Attributes:
+        feature (np.ndarray): Split feature per node (LEAF for leaves).
+        threshold (np.ndarray): Split threshold per node (0.0 for leaves).
+        left (np.ndarray): Index of the left child (LEAF for leaves).
+        right (np.ndarray): Index of the right child (LEAF for leaves).
+        value (np.ndarray): Predicted class per node (predicted_class for internal nodes);
+            float predicted values (node means for internal nodes) for regression trees.
+        node_ids (np.ndarray): Node.id per node (-1 where the id is unset).
+        missing_left (np.ndarray): Whether missing (NaN) values go left, per node.
+        cat_index (np.ndarray): Row of cat_table for categorical splits (LEAF for numeric splits).
+        cat_table (np.ndarray): Boolean (categorical nodes x category code) table, True = left.
+        parent (np.ndarray): Index of the parent node (LEAF for the root); derived if not given.
+    """
+    # Every attribute is a NumPy array; listed in constructor order
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "node_ids",
+              "missing_left", "cat_index", "cat_table", "parent")
+    __slots__ = ARRAYS
+
+    def __init__(self,
+                 feature: np.ndarray,
+                 threshold: np.ndarray,
+                 left: np.ndarray,
+                 right: np.ndarray,
+                 value: np.ndarray,
+                 node_ids: np.ndarray,
+                 missing_left: np.ndarray | None = None,
+                 cat_index: np.ndarray | None = None,
+                 cat_table: np.ndarray | None = None,
+                 parent: np.ndarray | None = None):
+        n = len(feature)
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.node_ids = node_ids
+        self.missing_left = missing_left if missing_left is not None else np.zeros(n, dtype=bool)
+        self.cat_index = cat_index if cat_index is not None else np.full(n, LEAF, dtype=np.int32)
+        self.cat_table = cat_table if cat_table is not None else np.zeros((0, 0), dtype=bool)
+        if parent is None:
+            parent = np.full(n, LEAF, dtype=np.int32)
+            internal = np.flatnonzero(feature != LEAF)
+            parent[left[internal]] = internal
+            parent[right[internal]] = internal
+        self.parent = parent
+
+    @classmethod
+    def from_tree(cls, tree) -> "FlatTree":
+        """
+        Compile a DecisionTree (or any object with a `root` Node) into arrays.
+        Args:
+            tree (DecisionTree): Trained or imported tree.
+        Returns:
+            FlatTree: Array-backed copy of the tree.
+        """
+        if tree.root is None:
+            raise ValueError("Cannot flatten an empty tree")
+
+        order, index = breadth_first(tree.root)
+
+        n = len(order)
+        feature = np.full(n, LEAF, dtype=np.int32)
+        threshold = np.zeros(n, dtype=np.float64)
+        left = np.full(n, LEAF, dtype=np.int32)
+        right = np.full(n, LEAF, dtype=np.int32)
+        regression = getattr(tree, "task", "classification") == "regression"
+        value = np.zeros(n, dtype=np.float64 if regression else np.int64)
+        node_ids = np.full(n, -1, dtype=np.int64)
+        missing_left = np.zeros(n, dtype=bool)
+        cat_index = np.full(n, LEAF, dtype=np.int32)
+        category_sets = []
+
+        for i, node in enumerate(order):
+            if node.id is not None:
+                node_ids[i] = node.id
+            if node.is_leaf():
+                value[i] = node.value
+                continue
+            fallback = node.mean if regression else node.predicted_class
+            value[i] = fallback if fallback is not None else 0
+            feature[i] = node.feature
+            threshold[i] = node.threshold
+            left[i] = index[node.left]
+            right[i] = index[node.right]
+            missing_left[i] = bool(node.missing_left)
+            if node.categories is not None:
+                cat_index[i] = len(category_sets)
+                category_sets.append(node.categories)
+
+        width = max((max(c, default=-1) for c in category_sets), default=-1) + 1
+        cat_table = np.zeros((len(category_sets), width), dtype=bool)
+        for row, categories in enumerate(category_sets):
+            cat_table[row, list(categories)] = True
+
+        return cls(feature, threshold, left, right, value, node_ids, missing_left, cat_index, cat_table)
+
+    def __len__(self) -> int:
+        return len(self.feature)
+
+    def n_features(self) -> int:
+        """
+        Number of features an input needs: the highest split feature + 1 (0 for a single leaf).
+        """
+        internal = self.feature[self.feature != LEAF]
+        return int(internal.max()) + 1 if len(internal) else 0
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Return the index of the leaf each row lands in.
+        Args:
+            X (np.ndarray): Feature matrix (samples x features).
+        Returns:
+            np.ndarray: Leaf index per row.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        idx = np.zeros(len(X), dtype=np.int32)
+        active = np.arange(len(X))
+        while active.size:
+            node = idx[active]
+            internal = self.feature[node] != LEAF
+            active, node = active[internal], node[internal]
+            if not active.size:
+                break
+            values = X[active, self.feature[node]]
+            go_left = values <= self.threshold[node]
+            if len(self.cat_table):
+                rows = self.cat_index[node]
+                categorical = rows != LEAF
+                if categorical.any():
+                    codes = values[categorical]
+                    known = (codes >= 0) & (codes < self.cat_table.shape[1]) & (codes == np.floor(codes))
+                    in_set = np.zeros(len(codes), dtype=bool)
+                    in_set[known] = self.cat_table[rows[categorical][known], codes[known].astype(np.intp)]
+                    go_left[categorical] = in_set
+            go_left = np.where(np.isnan(values), self.missing_left[node], go_left)
+            idx[active] = np.where(go_left, self.left[node], self.right[node])
+        return idx
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict class labels for multiple samples in one vectorized pass.
+        Args:
+            X (np.ndarray): Feature matrix (samples x features).
+        Returns:
+            np.ndarray: Predicted class label per sample.
+        """
+        return self.value[self.apply(X)]
+
+    def decision_path(self, index: int) -> list:
+        """
+        Return the node ids from the root down to the node at `index`.
+        Args:
+            index (int): Node index (typically a leaf returned by apply()).
+        Returns:
+            list: Node ids visited (None where the id is unset), root first.
+        """
+        path = []
+        i = int(index)
+        while i != LEAF:
+            nid = int(self.node_ids[i])
+            path.append(nid if nid >= 0 else None)
+            i = int(self.parent[i])
+        path.reverse()
+        return path
+
+    def predict_one(self, x: np.ndarray):
+        """
+        Predict the class label (or value) for a single sample, recording the path.
+        Args:
+            x (np.ndarray): Feature vector for a single sample.
+        Returns:
+            int | float: Predicted class label, or value for regression trees.
+            list: Node ids visited (None where the id is unset).
+        """
+        feature, threshold = self.feature, self.threshold
+        left, right, node_ids = self.left, self.right, self.node_ids
+        i = 0
+        path = []
+        while True:
+            nid = int(node_ids[i])
+            path.append(nid if nid >= 0 else None)
+            f = feature[i]
+            if f == LEAF:
+                return self.value[i].item(), path
+            v = x[f]
+            if v != v:  # NaN
+                go_left = self.missing_left[i]
+            elif self.cat_index[i] != LEAF:
+                go_left = self.__in_categories__(self.cat_index[i], v)
+            else:
+                go_left = v <= threshold[i]
+            i = left[i] if go_left else right[i]
+
+    def __in_categories__(self, row: int, value: float) -> bool:
+        """
+        Check whether a category code is in the left set of a categorical split.
+        """
+        if value < 0 or value >= self.cat_table.shape[1] or value != int(value):
+            return False
+        return bool(self.cat_table[row, int(value)])
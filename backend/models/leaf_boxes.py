@@ -0,0 +1,237 @@
+"""
+Leaf hyper-rectangle index for counterfactual queries.
+------------------------------------------------------
+Every leaf of a tree is the set of inputs satisfying the splits on its
+root-to-leaf path, i.e. an axis-aligned box: `lower < x_j <= upper` for numeric
+features (plus an allowed category set for categorical features). The boxes are
+computed once per model; a counterfactual query then returns, for each class other
+than the predicted one, the nearest box of that class under a per-feature-scaled
+L1 or L2 distance and the closest point inside it.
+
+Missing values are treated as free: they cost nothing and are filled in with a
+value inside the target box when that box constrains the feature.
+"""
+from __future__ import annotations
+import numpy as np
+
+from backend.models.flat_tree import FlatTree, LEAF
+
+NORMS = ("l1", "l2")
+CHUNK_CELLS = 2_000_000   # Rows are processed in chunks of about this many (row, leaf, feature) cells
+
+
+def _closest_lower(lower: np.ndarray) -> np.ndarray:
+    """
+    Smallest admissible value above exclusive lower bounds: the next float up.
+    An input equal to a threshold goes left, so reaching the right box costs that step.
+    """
+    return np.where(np.isfinite(lower), np.nextafter(lower, np.inf), lower)
+
+
+class LeafBoxIndex:
+    """
+    Bounding box of every leaf of a FlatTree.
+
+    Attributes:
+        flat (FlatTree): The indexed model.
+        leaves (np.ndarray): FlatTree index of each leaf.
+        leaf_class (np.ndarray): Predicted class of each leaf.
+        lower (np.ndarray): (leaves x features) exclusive lower bounds (-inf if unbounded).
+        upper (np.ndarray): (leaves x features) inclusive upper bounds (+inf if unbounded).
+        allowed (list[tuple[int, int, np.ndarray]]): (leaf row, feature, allowed-code mask)
+            for every categorical constraint.
+    """
+    __slots__ = ("flat", "leaves", "leaf_class", "lower", "upper", "allowed")
+
+    def __init__(self, flat: FlatTree, n_features: int | None = None):
+        internal = flat.feature != LEAF
+        if n_features is None:
+            n_features = int(flat.feature[internal].max()) + 1 if internal.any() else 0
+        n = len(flat)
+        width = flat.cat_table.shape[1]
+
+        # Propagate bounds top-down; BFS order guarantees parents come first
+        lower = np.full((n, n_features), -np.inf)
+        upper = np.full((n, n_features), np.inf)
+        masks: list[dict[int, np.ndarray]] = [{} for _ in range(n)]
+        for i in np.flatnonzero(internal).tolist():
+            f = int(flat.feature[i])
+            for child, is_left in ((int(flat.left[i]), True), (int(flat.right[i]), False)):
+                lower[child] = lower[i]
+                upper[child] = upper[i]
+                masks[child] = dict(masks[i])
+                if flat.cat_index[i] != LEAF:
+                    in_set = flat.cat_table[flat.cat_index[i]]
+                    side = in_set if is_left else ~in_set
+                    masks[child][f] = masks[child].get(f, np.ones(width, dtype=bool)) & side
+                elif is_left:
+                    upper[child, f] = min(upper[child, f], flat.threshold[i])
+                else:
+                    lower[child, f] = max(lower[child, f], flat.threshold[i])
+
+        self.flat = flat
+        self.leaves = np.flatnonzero(~internal)
+        self.leaf_class = np.asarray(flat.value)[self.leaves]
+        self.lower = lower[self.leaves]
+        self.upper = upper[self.leaves]
+        self.allowed = [(row, f, mask)
+                        for row, leaf in enumerate(self.leaves.tolist())
+                        for f, mask in masks[leaf].items()]
+
+    def distances(self, X: np.ndarray, scale: np.ndarray | None = None, norm: str = "l2") -> np.ndarray:
+        """
+        Scaled distance from every row to every leaf box.
+        Args:
+            X (np.ndarray): Inputs (rows x features); NaN = missing.
+            scale (np.ndarray, optional): Per-feature divisor of the distance. Defaults to 1.
+            norm (str): "l1" or "l2".
+        Returns:
+            np.ndarray: (rows x leaves) distances.
+        """
+        if norm not in NORMS:
+            raise ValueError(f"norm must be one of {NORMS}")
+        X = np.asarray(X, dtype=np.float64)
+        n_features = self.lower.shape[1]
+        X = X[:, :n_features]
+        scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)[:n_features]
+        lower = _closest_lower(self.lower)
+
+        out = np.empty((len(X), len(self.leaves)))
+        chunk = max(1, CHUNK_CELLS // max(1, len(self.leaves) * max(1, n_features)))
+        for start in range(0, len(X), chunk):
+            x = X[start:start + chunk, None, :]
+            with np.errstate(invalid="ignore"):
+                gap = np.maximum(np.maximum(lower - x, x - self.upper), 0.0)
+            gap = np.where(np.isnan(gap), 0.0, gap) / scale
+            out[start:start + chunk] = gap.sum(axis=2) if norm == "l1" else (gap ** 2).sum(axis=2)
+
+        # Changing a category costs one scaled unit
+        for row, f, mask in self.allowed:
+            codes = X[:, f]
+            known = ~np.isnan(codes) & (codes >= 0) & (codes < len(mask)) & (codes == np.floor(codes))
+            ok = np.ones(len(X), dtype=bool)
+            ok[known] = mask[codes[known].astype(np.intp)]
+            ok[~known & ~np.isnan(codes)] = False
+            penalty = 1.0 / scale[f]
+            out[~ok, row] += penalty if norm == "l1" else penalty ** 2
+        return out if norm == "l1" else np.sqrt(out)
+
+    def query_batch(self, X: np.ndarray, scale: np.ndarray | None = None, norm: str = "l2") -> list[list[tuple]]:
+        """
+        Nearest box of every non-predicted class, for many inputs at once.
+        Args:
+            X (np.ndarray): Inputs (rows x features); NaN = missing.
+            scale (np.ndarray, optional): Per-feature divisor of the distance. Defaults to 1.
+            norm (str): "l1" or "l2".
+        Returns:
+            list[list[tuple]]: Per row, (target_class, distance, leaf_row, counterfactual_x)
+                for each other class, nearest first.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        predicted = self.flat.predict(X)
+        dist = self.distances(X, scale, norm)
+        classes = np.unique(self.leaf_class)
+        results = []
+        for r in range(len(X)):
+            row = []
+            for c in classes.tolist():
+                if c == predicted[r]:
+                    continue
+                candidates = np.flatnonzero(self.leaf_class == c)
+                best = int(candidates[np.argmin(dist[r, candidates])])
+                row.append((int(c), float(dist[r, best]), best, self.point(X[r], best)))
+            row.sort(key=lambda item: item[1])
+            results.append(row)
+        return results
+
+    def query(self, x: np.ndarray, scale: np.ndarray | None = None, norm: str = "l2") -> list[tuple]:
+        """
+        Nearest box of every non-predicted class for a single input. See query_batch.
+        """
+        return self.query_batch(np.asarray(x, dtype=np.float64)[None, :], scale, norm)[0]
+
+    def point(self, x: np.ndarray, leaf_row: int) -> np.ndarray:
+        """
+        Closest point to x inside a leaf box.
+        Args:
+            x (np.ndarray): Input; NaN = missing.
+            leaf_row (int): Row of the leaf in this index.
+        Returns:
+            np.ndarray: Counterfactual input that lands in the leaf.
+        """
+        x = np.array(x, dtype=np.float64)
+        n_features = self.lower.shape[1]
+        lower = _closest_lower(self.lower[leaf_row])
+        upper = self.upper[leaf_row]
+        head = x[:n_features]
+        missing = np.isnan(head)
+        fill = np.where(np.isfinite(upper), upper, np.where(np.isfinite(lower), lower, np.nan))
+        head = np.clip(np.where(missing, fill, head), lower, upper)
+        for row, f, mask in self.allowed:
+            if row == leaf_row and mask.any():
+                v = head[f]
+                if not (v == v and 0 <= v < len(mask) and v == int(v) and mask[int(v)]):
+                    head[f] = float(np.flatnonzero(mask)[0])
+        x[:n_features] = head
+        return x
+
+
+def slice_boxes(flat: FlatTree, x: np.ndarray, feature_x: int, feature_y: int) -> list[tuple]:
+    """
+    Exact 2-D decision regions of a tree on the plane of two features, with every
+    other feature fixed at its value in x. Each region is a leaf box restricted to
+    the plane; splits on fixed features are routed like a prediction (NaN included).
+    Args:
+        flat (FlatTree): Model to slice.
+        x (np.ndarray): Values of the fixed features (the plotted two are ignored).
+        feature_x (int): Feature on the horizontal axis.
+        feature_y (int): Feature on the vertical axis.
+    Returns:
+        list[tuple]: (leaf index, [x_lo, x_hi, y_lo, y_hi], x_mask, y_mask) per region,
+            with exclusive lower / inclusive upper bounds (+-inf if unbounded) and the
+            allowed-code mask of a categorical axis (None for numeric axes).
+    """
+    if feature_x == feature_y:
+        raise ValueError("feature_x and feature_y must differ")
+    x = np.asarray(x, dtype=np.float64)
+    width = flat.cat_table.shape[1]
+    axes = {feature_x: 0, feature_y: 1}
+    regions = []
+    stack = [(0, np.array([-np.inf, np.inf, -np.inf, np.inf]), None, None)]
+    while stack:
+        i, bounds, x_mask, y_mask = stack.pop()
+        f = int(flat.feature[i])
+        if f == LEAF:
+            regions.append((i, bounds, x_mask, y_mask))
+            continue
+        left, right = int(flat.left[i]), int(flat.right[i])
+        axis = axes.get(f)
+        if axis is None:
+            v = x[f]
+            if v != v:  # NaN
+                go_left = flat.missing_left[i]
+            elif flat.cat_index[i] != LEAF:
+                go_left = flat.__in_categories__(flat.cat_index[i], v)
+            else:
+                go_left = v <= flat.threshold[i]
+            stack.append((left if go_left else right, bounds, x_mask, y_mask))
+        elif flat.cat_index[i] != LEAF:
+            in_set = flat.cat_table[flat.cat_index[i]]
+            mask = (x_mask, y_mask)[axis]
+            mask = np.ones(width, dtype=bool) if mask is None else mask
+            for child, side in ((left, in_set), (right, ~in_set)):
+                child_mask = mask & side
+                if child_mask.any():
+                    stack.append((child, bounds, *((child_mask, y_mask) if axis == 0 else (x_mask, child_mask))))
+        else:
+            t = flat.threshold[i]
+            lo, hi = 2 * axis, 2 * axis + 1
+            if bounds[lo] < t:
+                child = bounds.copy()
+                child[hi] = min(child[hi], t)
+                stack.append((left, child, x_mask, y_mask))
+            if t < bounds[hi]:
+                child = bounds.copy()
+                child[lo] = max(child[lo], t)
+                stack.append((right, child, x_mask, y_mask))
+    return regions
@@ -0,0 +1,234 @@
+"""
+Decision Tree Regressor for Continuous Targets
+------------------------------------------------------
+Regression counterpart of DecisionTree. Splits maximise variance reduction (the
+drop in mean squared error around the node mean), evaluated for every threshold
+of a feature in one pass with prefix sums of the targets and squared targets.
+Leaves predict the mean or the median of their targets.
+
+Tree growth (best-first, leaf and time budgets), categorical splits, missing-value
+routing, prediction and code generation are inherited unchanged; `IG` holds the
+variance reduction of a split and `mean` / `variance` replace the class counts.
+"""
+from __future__ import annotations
+import numpy as np
+
+from backend.models.decision_tree import DecisionTree, Node
+
+
+MIN_VARIANCE_REDUCTION = 0.0   # Splits with variance reduction at or below this become leaves
+LEAF_VALUES = ("mean", "median")
+
+
+def _sse_rows(count: np.ndarray, total: np.ndarray, total_sq: np.ndarray) -> np.ndarray:
+    """
+    Sum of squared errors around the mean for every candidate side, from its
+    count, sum and sum of squares.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sse = total_sq - np.where(count > 0, total ** 2 / count, 0.0)
+    return np.maximum(sse, 0.0)
+
+
+def _variance_reduction(left: tuple, right: tuple, node_sse: float, n: int) -> np.ndarray:
+    """
+    Variance reduction of every candidate split given (count, sum, sum of squares)
+    of the targets sent left and right.
+    """
+    return (node_sse - _sse_rows(*left) - _sse_rows(*right)) / n
+
+
+def _best_missing_direction(left: tuple, right: tuple, missing: tuple, node_sse: float, n: int):
+    """
+    Score each candidate split with the missing-value rows sent left and right.
+    Without missing rows, missing values default to the larger child.
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (variance_reduction, missing_left) per candidate.
+    """
+    if not missing[0]:
+        return _variance_reduction(left, right, node_sse, n), left[0] >= right[0]
+    with_left = tuple(a + b for a, b in zip(left, missing))
+    with_right = tuple(a + b for a, b in zip(right, missing))
+    gain_left = _variance_reduction(with_left, right, node_sse, n)
+    gain_right = _variance_reduction(left, with_right, node_sse, n)
+    return np.maximum(gain_left, gain_right), gain_left >= gain_right
+
+
+class RegressionTree(DecisionTree):
+    """
+    Decision Tree regressor for continuous targets.
+    Utilizes variance reduction to determine optimal splits.
+    """
+    task = "regression"
+
+    def __init__(self,
+                 max_depth: int | None = None,
+                 min_samples_per_leaf: int | None = None,
+                 root: Node | None = None,
+                 categorical_features: list[int] | None = None,
+                 max_leaf_nodes: int | None = None,
+                 time_budget_s: float | None = None,
+                 min_variance_reduction: float | None = None,
+                 leaf_value: str = "mean"
+                 ):
+        """
+        Initialize the RegressionTree.
+        Args:
+            max_depth (int, optional): Maximum depth of the tree. Defaults to MAX_DEPTH.
+            min_samples_per_leaf (int, optional): Minimum samples required per leaf. Defaults to MIN_SAMPLES_PER_LEAF.
+            root (Node, optional): Root node of the tree. Used for deserialization or custom trees.
+            categorical_features (list[int], optional): Indices of features holding non-negative
+                integer category codes, split natively by category set instead of threshold.
+            max_leaf_nodes (int, optional): Stop growing once the tree has this many leaves. Defaults to no limit.
+            time_budget_s (float, optional): Wall-clock budget for fit(). Defaults to no limit.
+            min_variance_reduction (float, optional): Splits at or below this variance reduction
+                become leaves. Defaults to MIN_VARIANCE_REDUCTION.
+            leaf_value (str): "mean" or "median" of the targets reaching a leaf.
+        """
+        if leaf_value not in LEAF_VALUES:
+            raise ValueError(f"leaf_value must be one of {LEAF_VALUES}")
+        super().__init__(max_depth=max_depth,
+                         min_samples_per_leaf=min_samples_per_leaf,
+                         root=root,
+                         categorical_features=categorical_features,
+                         max_leaf_nodes=max_leaf_nodes,
+                         time_budget_s=time_budget_s,
+                         min_information_gain=min_variance_reduction
+                         if min_variance_reduction is not None else MIN_VARIANCE_REDUCTION)
+        self.leaf_value = leaf_value
+
+    def fit(self, features: np.ndarray, targets: np.ndarray):
+        """
+        Train the regression tree using the provided features and targets.
+        Args:
+            features (np.ndarray): Feature matrix (samples x features). NaN marks a missing value.
+            targets (np.ndarray): Continuous targets.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        if np.isnan(targets).any():
+            raise ValueError("Targets must not contain NaN")
+        self.__check_categorical__(features)
+        self.compiled_predict = None
+        self.root = self.__build__(Node(), features, targets)
+
+    def determine_threshold(self,
+                            features: np.ndarray,
+                            targets: np.ndarray):
+        """
+        Identify the optimal feature and split, maximizing variance reduction.
+        Args:
+            features (np.ndarray): Feature matrix (samples x features).
+            targets (np.ndarray): Continuous targets.
+        Returns:
+            tuple: (best_threshold, best_feature_index, max_variance_reduction, categories, missing_left)
+                where categories is the tuple of category codes sent left (None for numeric splits).
+        """
+        features = np.asarray(features, dtype=np.float64)
+        # Centering keeps the sum-of-squares prefix sums numerically stable
+        targets = np.asarray(targets, dtype=np.float64)
+        targets = targets - targets.mean()
+        node_sse = float(np.dot(targets, targets))
+
+        best = (None, None, -np.inf, None, True)
+        for feature in range(features.shape[1]):
+            column = features[:, feature]
+            if feature in self.categorical_features:
+                candidate = self.__categorical_split__(column, targets, node_sse)
+            else:
+                candidate = self.__numeric_split__(column, targets, node_sse)
+            if candidate is None:
+                continue
+            threshold, gain, categories, missing_left = candidate
+            if gain > best[2]:
+                best = (threshold, feature, gain, categories, missing_left)
+
+        if best[1] is None:
+            return None, None, 0.0, None, True
+        return best
+
+    def __numeric_split__(self, column, targets, node_sse):
+        """
+        Evaluate every midpoint threshold of a numeric feature in one pass using
+        prefix sums of the targets and squared targets over the sorted values.
+        Returns:
+            tuple | None: (threshold, variance_reduction, None, missing_left), or None if the
+                feature has fewer than two distinct values.
+        """
+        present = ~np.isnan(column)
+        values = column[present]
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        unique = np.unique(values)
+        if len(unique) < 2:
+            return None
+
+        y = targets[present][order]
+        thresholds = (unique[:-1] + unique[1:]) / 2
+        n_left = np.searchsorted(values, thresholds, side="right")
+        prefix = np.cumsum(y)[n_left - 1]
+        prefix_sq = np.cumsum(y * y)[n_left - 1]
+        left = (n_left, prefix, prefix_sq)
+        right = (len(y) - n_left, y.sum() - prefix, np.dot(y, y) - prefix_sq)
+        gain, missing_left = _best_missing_direction(left, right, self.__missing_stats__(targets, present),
+                                                     node_sse, len(targets))
+        best = int(np.argmax(gain))
+        return thresholds[best], gain[best], None, bool(missing_left[best])
+
+    def __categorical_split__(self, column, targets, node_sse):
+        """
+        Evaluate k-1 category partitions instead of 2^k: categories are ordered by their
+        mean target and each prefix of that order is a candidate left set, which is
+        exact for squared error.
+        Returns:
+            tuple | None: (None, variance_reduction, categories, missing_left), or None if the
+                feature has fewer than two distinct categories.
+        """
+        present = ~np.isnan(column)
+        codes = column[present].astype(np.intp)
+        categories, inverse = np.unique(codes, return_inverse=True)
+        if len(categories) < 2:
+            return None
+
+        y = targets[present]
+        count = np.bincount(inverse, minlength=len(categories))
+        total = np.bincount(inverse, weights=y, minlength=len(categories))
+        total_sq = np.bincount(inverse, weights=y * y, minlength=len(categories))
+        order = np.argsort(total / count, kind="stable")
+
+        prefix = tuple(np.cumsum(a[order])[:-1] for a in (count, total, total_sq))
+        right = tuple(a.sum() - p for a, p in zip((count, total, total_sq), prefix))
+        gain, missing_left = _best_missing_direction(prefix, right, self.__missing_stats__(targets, present),
+                                                     node_sse, len(targets))
+        best = int(np.argmax(gain))
+        left_set = tuple(int(c) for c in np.sort(categories[order[:best + 1]]))
+        return None, gain[best], left_set, bool(missing_left[best])
+
+    @staticmethod
+    def __missing_stats__(targets: np.ndarray, present: np.ndarray) -> tuple:
+        """
+        (count, sum, sum of squares) of the targets whose feature value is missing.
+        """
+        missing = targets[~present]
+        return len(missing), missing.sum(), np.dot(missing, missing)
+
+    def __node_stats__(self, node: Node, targets: np.ndarray):
+        """
+        Record the sample count, target mean and target variance of a node.
+        Args:
+            node (Node): Node to annotate.
+            targets (np.ndarray): Targets reaching the node.
+        """
+        node.samples = len(targets)
+        node.mean = float(np.mean(targets))
+        node.variance = float(np.var(targets))
+
+    def __make_leaf__(self, node: Node, targets: np.ndarray):
+        """
+        Turn a node into a leaf predicting the mean or median of its targets.
+        Args:
+            node (Node): Node to finalize.
+            targets (np.ndarray): Targets reaching the node.
+        """
+        self.__node_stats__(node, targets)
+        node.value = node.mean if self.leaf_value == "mean" else float(np.median(targets))
@@ -0,0 +1,212 @@
+"""
+Asyncio micro-batching in front of the prediction service.
+------------------------------------------------------
+Concurrent /predict calls for the same model are collected for at most
+`window_s` seconds (or until `max_batch_size` rows are queued), scored together
+with one vectorized FlatTree call, and the results are fanned back out to the
+waiting requests. The window is started by the first request of a batch, so
+no request waits longer than the configured window before being scored (the
+event loop rounds timers up to its ~1 ms resolution).
+
+Only cheap work runs on the event loop: a batch for a cached model is one
+vectorized call. Importing a tree on a cache miss, the one-by-one fallback and
+unbatched scoring (window 0) run in the default thread pool, as the sync route
+did before batching.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import marshal
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+import numpy as np
+
+from backend.dashboard import dto
+from backend.dashboard.tree_importer import tree_importer
+from backend.models.flat_tree import FlatTree
+from backend.services.prediction_service import prediction_service
+
+# Batching configuration (overridable through the environment)
+BATCH_WINDOW_MS = float(os.environ.get("PREDICT_BATCH_WINDOW_MS", 2.0))   # 0 disables batching
+MAX_BATCH_SIZE = int(os.environ.get("PREDICT_MAX_BATCH_SIZE", 64))
+MODEL_CACHE_SIZE = 32      # Number of compiled models kept per batcher
+
+
+def model_key(tree: dict[str, Any]) -> str:
+    """
+    Identifier for a tree JSON, used to group requests for the same model.
+    Hashes the marshal encoding, which is several times cheaper than importing
+    the tree (json.dumps / repr spend most of their time formatting floats).
+    The same body always decodes to the same key order; a differently-ordered
+    copy only costs a cache miss.
+    Args:
+        tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+    Returns:
+        str: Hex digest of the decoded tree.
+    """
+    try:
+        payload = marshal.dumps(tree)
+    except ValueError:  # Not plain JSON types
+        payload = repr(tree).encode()
+    return hashlib.sha1(payload).hexdigest()
+
+
+class PredictionBatcher:
+    """
+    Groups concurrent single-row predictions per model and scores them in one call.
+
+    Attributes:
+        window_s (float): Longest time a request waits for its batch to fill.
+        max_batch_size (int): A batch is scored as soon as it holds this many rows.
+        pending (dict[str, list]): Queued (x, future) pairs per model key.
+        models (OrderedDict[str, FlatTree]): LRU cache of compiled models, shared with the
+            threadpool routes (counterfactuals, regions) and guarded by `lock`.
+    """
+    def __init__(self,
+                 window_ms: float = BATCH_WINDOW_MS,
+                 max_batch_size: int = MAX_BATCH_SIZE,
+                 cache_size: int = MODEL_CACHE_SIZE):
+        self.window_s = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.pending: dict[str, list] = {}
+        self.timers: dict[str, asyncio.TimerHandle] = {}
+        self.trees: dict[str, dict[str, Any]] = {}
+        self.models: OrderedDict[str, FlatTree] = OrderedDict()
+        self.lock = threading.Lock()
+
+    async def submit(self, tree: dict[str, Any], x: list[float], key: str | None = None) -> dto.PredictionDTO:
+        """
+        Queue one prediction and wait for its batch to be scored.
+        Args:
+            tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+            x (list[float]): Feature vector for a single sample.
+            key (str, optional): Model key returned by model_key(), if already computed.
+        Returns:
+            dto.PredictionDTO: Predicted class and path.
+        """
+        loop = asyncio.get_running_loop()
+        if self.window_s <= 0:
+            return await loop.run_in_executor(None, prediction_service, tree, x)
+
+        key = key or model_key(tree)
+        future = loop.create_future()
+        batch = self.pending.setdefault(key, [])
+        batch.append((x, future))
+        if len(batch) == 1:
+            self.trees[key] = tree
+            self.timers[key] = loop.call_later(self.window_s, self.flush, key)
+        if len(batch) >= self.max_batch_size:
+            self.flush(key)
+        return await future
+
+    def flush(self, key: str):
+        """
+        Score every queued request for a model and resolve their futures.
+        Args:
+            key (str): Model key returned by model_key().
+        """
+        timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.pending.pop(key, None)
+        tree = self.trees.pop(key, None)
+        if not batch:
+            return
+
+        rows = [x for x, _ in batch]
+        if self.cached(key):
+            try:
+                self.__resolve__(batch, self.score(key, tree, rows))
+                return
+            except Exception:
+                pass  # Rescored row by row in the thread pool
+        scored = asyncio.get_running_loop().run_in_executor(None, self.__score_rows__, key, tree, rows)
+        scored.add_done_callback(lambda done: self.__resolve__(
+            batch, done.result() if done.exception() is None else [done.exception()] * len(batch)))
+
+    def cached(self, key: str) -> bool:
+        """
+        Check whether the compiled model for a key is already in the cache.
+        """
+        with self.lock:
+            return key in self.models
+
+    def __score_rows__(self, key: str, tree: dict[str, Any], rows: list[list[float]]) -> list:
+        """
+        Score a batch off the event loop. If the batch fails, score row by row so one bad
+        row (or a bad tree) does not fail its neighbours.
+        Returns:
+            list: PredictionDTO or the raised exception, per row.
+        """
+        try:
+            return self.score(key, tree, rows)
+        except Exception:
+            results = []
+            for x in rows:
+                try:
+                    results.append(prediction_service(tree, x))
+                except Exception as exc:
+                    results.append(exc)
+            return results
+
+    @staticmethod
+    def __resolve__(batch: list, results: list):
+        """
+        Hand each queued request its result (or exception).
+        """
+        for (_, future), result in zip(batch, results):
+            if future.done():  # Caller went away (request cancelled)
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def score(self, key: str, tree: dict[str, Any], rows: list[list[float]]) -> list[dto.PredictionDTO]:
+        """
+        Score a batch of rows for one model with a single vectorized call.
+        Args:
+            key (str): Model key returned by model_key().
+            tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+            rows (list[list[float]]): Feature vectors.
+        Returns:
+            list[dto.PredictionDTO]: One prediction per row, in order.
+        """
+        flat = self.model(key, tree)
+        leaves = flat.apply(np.asarray(rows, dtype=np.float64))
+        paths = {}
+        results = []
+        for leaf in leaves.tolist():
+            if leaf not in paths:
+                paths[leaf] = flat.decision_path(leaf)
+            results.append(dto.PredictionDTO(flat.value[leaf].item(), list(paths[leaf])))
+        return results
+
+    def model(self, key: str, tree: dict[str, Any]) -> FlatTree:
+        """
+        Return the compiled model for a tree, importing it on a cache miss.
+        Args:
+            key (str): Model key returned by model_key().
+            tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+        Returns:
+            FlatTree: Array-backed model.
+        """
+        with self.lock:
+            flat = self.models.get(key)
+            if flat is not None:
+                self.models.move_to_end(key)
+                return flat
+        # Import outside the lock; two threads missing at once just build the model twice
+        flat = FlatTree.from_tree(tree_importer(tree))
+        with self.lock:
+            self.models[key] = flat
+            self.models.move_to_end(key)
+            while len(self.models) > self.cache_size:
+                self.models.popitem(last=False)
+        return flat
+
+
+prediction_batcher = PredictionBatcher()
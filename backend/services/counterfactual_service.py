@@ -0,0 +1,95 @@
+"""
+Counterfactual explanations: the smallest feature change that flips a prediction.
+------------------------------------------------------
+Leaf bounding boxes are built once per model (keyed like the prediction batcher)
+and every query is answered from the box index instead of by probing predict_one.
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any
+import numpy as np
+
+from backend.dashboard import dto
+from backend.models.leaf_boxes import LeafBoxIndex
+from backend.services.batching_service import model_key, prediction_batcher
+
+INDEX_CACHE_SIZE = 32   # Number of leaf box indexes kept in memory
+DEFAULT_NORM = "l2"
+
+_indexes: OrderedDict[str, LeafBoxIndex] = OrderedDict()
+_lock = threading.Lock()
+
+
+def leaf_box_index(tree: dict[str, Any], key: str | None = None) -> LeafBoxIndex:
+    """
+    Return the leaf box index of a tree JSON, building it on a cache miss.
+    Args:
+        tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+        key (str, optional): Model key returned by model_key(), if already computed.
+    Returns:
+        LeafBoxIndex: Bounding boxes of the tree's leaves.
+    """
+    key = key or model_key(tree)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = LeafBoxIndex(prediction_batcher.model(key, tree))
+    with _lock:
+        _indexes[key] = index
+        if len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def counterfactuals_batch(tree: dict[str, Any],
+                          X: list[list[float]],
+                          scale: list[float] | None = None,
+                          norm: str = DEFAULT_NORM,
+                          key: str | None = None) -> list[list[dto.CounterfactualDTO]]:
+    """
+    Nearest input of every other class for each row.
+    Args:
+        tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+        X (list[list[float]]): Feature vectors; NaN = missing.
+        scale (list[float], optional): Per-feature divisor of the distance (e.g. feature std).
+        norm (str): "l1" or "l2".
+        key (str, optional): Model key returned by model_key(), if already computed.
+    Returns:
+        list[list[dto.CounterfactualDTO]]: Per row, one counterfactual per other class, nearest first.
+    """
+    if tree.get("task") == "regression":
+        raise ValueError("Counterfactuals need a classification tree; regression leaves have no class to flip")
+    index = leaf_box_index(tree, key)
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] < index.lower.shape[1]:
+        raise ValueError(f"Each input needs at least {index.lower.shape[1]} features")
+    if scale is not None and (len(scale) < index.lower.shape[1] or min(scale) <= 0):
+        raise ValueError("scale needs a positive value for every feature")
+
+    results = []
+    for x, matches in zip(X, index.query_batch(X, scale, norm)):
+        row = []
+        for target_class, distance, leaf_row, point in matches:
+            changed = ~((point == x) | (np.isnan(point) & np.isnan(x)))
+            row.append(dto.CounterfactualDTO(
+                target_class=target_class,
+                distance=distance,
+                leaf_id=int(index.flat.node_ids[index.leaves[leaf_row]]),
+                x=[None if np.isnan(v) else v for v in point.tolist()],
+                changed_features=np.flatnonzero(changed).tolist()))
+        results.append(row)
+    return results
+
+
+def counterfactuals(tree: dict[str, Any],
+                    x: list[float],
+                    scale: list[float] | None = None,
+                    norm: str = DEFAULT_NORM,
+                    key: str | None = None) -> list[dto.CounterfactualDTO]:
+    """
+    Nearest input of every other class for a single feature vector. See counterfactuals_batch.
+    """
+    return counterfactuals_batch(tree, [x], scale, norm, key)[0]
@@ -0,0 +1,223 @@
+"""
+Global feature importance for a decision tree.
+------------------------------------------------------
+- Impurity (split-based) importance: the information gain of every split weighted
+  by the share of samples reaching it, summed per feature and normalized.
+- Permutation importance: the accuracy drop (classification) or mean squared error
+  increase (regression) when one feature column is shuffled, scored with the
+  vectorized FlatTree. Each repeat permutes every feature with its
+  own child seed of the request seed, so results do not depend on how repeats are
+  spread over the process pool. Small jobs are scored inline; larger ones are split
+  into one chunk of repeats per worker of a single, lazily created process pool.
+"""
+from __future__ import annotations
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+import numpy as np
+from scipy import stats
+
+from backend.dashboard import dto
+from backend.dashboard.tree_importer import tree_importer
+from backend.models.decision_tree import DecisionTree
+from backend.models.flat_tree import FlatTree, breadth_first
+from backend.services.tree_service import iris_split
+
+N_REPEATS = 10       # Default permutations per feature
+SEED = 0             # Default permutation seed
+CONFIDENCE = 0.95    # Confidence level of the reported interval
+INLINE_MAX_CELLS = 100_000   # Below this many rows x repeats, process startup/pickling costs more than scoring
+METRICS = ("accuracy", "mse")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    """
+    Shared worker pool, created on first use. Workers are spawned rather than forked,
+    since the server process runs threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def impurity_importance(tree: DecisionTree, n_features: int) -> np.ndarray:
+    """
+    Sum IG * (node samples / root samples) per split feature, normalized to sum to 1.
+    Args:
+        tree (DecisionTree): Trained or imported tree.
+        n_features (int): Number of features.
+    Returns:
+        np.ndarray: Importance per feature (all zeros for a single-leaf tree).
+    """
+    importance = np.zeros(n_features)
+    if tree.root is None:
+        return importance
+    order, _ = breadth_first(tree.root)
+    root_samples = _node_samples(tree.root)
+    for node in order:
+        if node.is_leaf() or node.IG is None:
+            continue
+        weight = _node_samples(node) / root_samples if root_samples else 0.0
+        importance[node.feature] += node.IG * weight
+    total = importance.sum()
+    return importance / total if total > 0 else importance
+
+
+def _node_samples(node) -> int:
+    if node.samples is not None:
+        return node.samples
+    if node.class_counts is not None:
+        return int(np.sum(node.class_counts))
+    return 0
+
+
+def _score(flat: FlatTree, X: np.ndarray, y: np.ndarray, metric: str) -> float:
+    """
+    Higher-is-better score of the model on (X, y): accuracy, or negated mean squared error.
+    """
+    predictions = flat.predict(X)
+    if metric == "mse":
+        return -float(np.mean((predictions - y) ** 2))
+    return float(np.mean(predictions == y))
+
+
+def _permutation_repeat(flat: FlatTree,
+                        X: np.ndarray,
+                        y: np.ndarray,
+                        baseline: float,
+                        seed: np.random.SeedSequence,
+                        metric: str = "accuracy") -> np.ndarray:
+    """
+    One repeat: permute each feature in turn and record the score drop.
+    """
+    rng = np.random.default_rng(seed)
+    drops = np.empty(X.shape[1])
+    X_permuted = X.copy()
+    for feature in range(X.shape[1]):
+        X_permuted[:, feature] = X[rng.permutation(len(X)), feature]
+        drops[feature] = baseline - _score(flat, X_permuted, y, metric)
+        X_permuted[:, feature] = X[:, feature]
+    return drops
+
+
+def _permutation_repeats(flat: FlatTree,
+                         X: np.ndarray,
+                         y: np.ndarray,
+                         baseline: float,
+                         seeds: list[np.random.SeedSequence],
+                         metric: str = "accuracy") -> list[np.ndarray]:
+    """
+    A chunk of repeats, so the model and data are pickled once per worker, not per repeat.
+    Top-level so it can run in a worker process.
+    """
+    return [_permutation_repeat(flat, X, y, baseline, s, metric) for s in seeds]
+
+
+def permutation_importance(flat: FlatTree,
+                           X: np.ndarray,
+                           y: np.ndarray,
+                           n_repeats: int = N_REPEATS,
+                           seed: int = SEED,
+                           n_jobs: int | None = None,
+                           confidence: float = CONFIDENCE,
+                           metric: str = "accuracy") -> dict[str, Any]:
+    """
+    Permutation importance with per-feature confidence intervals.
+    Args:
+        flat (FlatTree): Model to score.
+        X (np.ndarray): Evaluation features.
+        y (np.ndarray): Evaluation labels, or targets for metric="mse".
+        n_repeats (int): Permutations per feature.
+        seed (int): Seed; the same seed gives the same result for any n_jobs.
+        n_jobs (int, optional): Chunks of repeats to spread over the shared pool. Defaults to the
+            CPU count, or inline when rows x repeats is below INLINE_MAX_CELLS; 1 runs inline.
+        confidence (float): Confidence level of the t-interval of the mean drop.
+        metric (str): "accuracy" (drop in accuracy) or "mse" (increase in mean squared error).
+    Returns:
+        dict[str, Any]: baseline (accuracy or MSE on the unpermuted data), mean, std,
+            ci_low, ci_high (arrays per feature).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64) if metric == "mse" else np.asarray(y)
+    baseline = _score(flat, X, y, metric)
+    seeds = np.random.SeedSequence(seed).spawn(n_repeats)
+    if n_jobs is None:
+        n_jobs = 1 if len(X) * n_repeats < INLINE_MAX_CELLS else os.cpu_count() or 1
+    n_jobs = min(n_jobs, n_repeats)
+
+    if n_jobs <= 1:
+        drops = _permutation_repeats(flat, X, y, baseline, seeds, metric)
+    else:
+        chunks = [list(chunk) for chunk in np.array_split(np.arange(n_repeats), n_jobs)]
+        futures = [_process_pool().submit(_permutation_repeats, flat, X, y, baseline,
+                                          [seeds[i] for i in chunk], metric)
+                   for chunk in chunks]
+        drops = [d for future in futures for d in future.result()]
+
+    drops = np.vstack(drops)
+    mean = drops.mean(axis=0)
+    std = drops.std(axis=0, ddof=1) if n_repeats > 1 else np.zeros(X.shape[1])
+    half_width = stats.t.ppf((1 + confidence) / 2, n_repeats - 1) * std / np.sqrt(n_repeats) \
+        if n_repeats > 1 else np.zeros(X.shape[1])
+    return {"baseline": abs(baseline), "mean": mean, "std": std,
+            "ci_low": mean - half_width, "ci_high": mean + half_width}
+
+
+def importance_service(tree: dict[str, Any],
+                       X: list[list[float]] | None = None,
+                       y: list[float] | None = None,
+                       n_repeats: int = N_REPEATS,
+                       seed: int = SEED,
+                       n_jobs: int | None = None) -> dto.FeatureImportanceDTO:
+    """
+    Compute impurity and permutation importance for a tree JSON. Permutations are
+    scored on the given data, or on the Iris test split /train holds out. Regression
+    trees are scored by mean squared error and need their own evaluation data.
+    """
+    backend_tree = tree_importer(tree)
+    metric = "mse" if tree.get("task") == "regression" else "accuracy"
+    if X is None or y is None:
+        if metric == "mse":
+            raise ValueError("Regression trees need evaluation data x and y")
+        _, X, _, y, *_ = iris_split()
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    flat = FlatTree.from_tree(backend_tree) if backend_tree.root is not None else None
+    n_features = flat.n_features() if flat is not None else 0
+    if X.ndim != 2 or len(X) == 0:
+        raise ValueError("x must be a non-empty list of feature vectors")
+    if y.ndim != 1 or len(y) != len(X):
+        raise ValueError(f"y needs one value per row of x ({len(X)}), got {y.size}")
+    if X.shape[1] < n_features:
+        raise ValueError(f"Each input needs at least {n_features} features")
+    feature_names = tree.get("feature_names") or [str(i) for i in range(X.shape[1])]
+
+    result = dto.FeatureImportanceDTO(feature_names=feature_names,
+                                      impurity_importance=impurity_importance(backend_tree, X.shape[1]),
+                                      n_repeats=n_repeats,
+                                      seed=seed,
+                                      metric=metric)
+    if flat is None:
+        return result
+
+    perm = permutation_importance(flat, X, y, n_repeats, seed, n_jobs, metric=metric)
+    if metric == "mse":
+        result.baseline_mse = perm["baseline"]
+    else:
+        result.baseline_accuracy = perm["baseline"]
+    result.permutation_mean = perm["mean"]
+    result.permutation_std = perm["std"]
+    result.ci_low = perm["ci_low"]
+    result.ci_high = perm["ci_high"]
+    result.confidence = CONFIDENCE
+    return result
@@ -0,0 +1,55 @@
+from backend.dashboard import dto
+from backend.dashboard.tree_importer import tree_importer
+from backend.dashboard.tree_exporter import export_tree
+from backend.data.model_store import model_store
+from typing import Any
+
+
+def publish_model(name: str, tree: dict[str, Any]) -> dict[str, Any]:
+    """
+    Publish a tree (TreeResponseDTO.to_dict() output) as a new version of a stored model.
+    """
+    backend_tree = tree_importer(tree)
+    version = model_store.publish(name,
+                                  backend_tree,
+                                  tree.get("feature_names"),
+                                  tree.get("label_names"),
+                                  tree.get("confusion_matrix"),
+                                  tree.get("confusion_matrix_metadata"))
+    return {"name": name, "version": version}
+
+
+def list_models() -> list[dict[str, Any]]:
+    """
+    List every stored model with its published versions.
+    """
+    return [{"name": name, "versions": model_store.list_versions(name)}
+            for name in model_store.list_models()]
+
+
+def get_model(name: str, version: int | None = None) -> dict[str, Any]:
+    """
+    Export a stored model in the same format as /train, for the dashboard.
+    """
+    with model_store.load(name, version) as stored:
+        meta = stored.meta
+        result = export_tree(stored.to_tree(),
+                             meta["feature_names"],
+                             meta["label_names"],
+                             meta["confusion_matrix"],
+                             meta["confusion_matrix_metadata"])
+        response = result.to_dict()
+        response["version"] = stored.version
+    return response
+
+
+def predict_model(name: str, x: list, version: int | None = None) -> dto.PredictionDTO:
+    """
+    Predict a single sample with a stored model, straight from its memory-mapped arrays.
+    """
+    with model_store.load(name, version) as stored:
+        n_features = stored.flat.n_features()
+        if len(x) < n_features:
+            raise ValueError(f"x needs at least {n_features} features")
+        pred, path = stored.flat.predict_one(x)
+    return dto.PredictionDTO(pred, path)
@@ -0,0 +1,219 @@
+"""
+Decision regions of a tree on a chosen pair of features.
+------------------------------------------------------
+The other features are fixed at given values. Regions are either the exact leaf
+boxes restricted to the plane ("rectangles") or a class raster scored with one
+vectorized FlatTree call ("grid").
+
+Results are cached per model and slice. A slice is keyed by which side of every
+split threshold each fixed value falls on, not by the raw values, so dragging a
+slider between two thresholds keeps hitting the same cache entry. Grids are kept
+as arrays and the cache is bounded by total cells as well as entries; grids larger
+than MAX_CACHED_GRID_CELLS are computed per request and never cached.
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any
+import numpy as np
+
+from backend.dashboard import dto
+from backend.models.flat_tree import FlatTree, LEAF
+from backend.models.leaf_boxes import slice_boxes
+from backend.services.batching_service import model_key, prediction_batcher
+
+MODES = ("rectangles", "grid")
+RESOLUTION = 100          # Default grid cells per axis
+MAX_RESOLUTION = 1000     # Largest grid side (1M predictions)
+REGION_CACHE_SIZE = 256   # Number of slices kept in memory
+REGION_CACHE_CELLS = 4_000_000    # Total grid cells (or rectangles) kept in memory, ~32 MB
+MAX_CACHED_GRID_CELLS = 250_000   # Larger grids are not cached
+RANGE_PADDING = 0.25      # Default axis range: split thresholds +- this share of their span
+UNSPLIT_HALF_WIDTH = 0.5  # Unsplit axes: the given value +- this share of its magnitude (at least 1)
+
+_regions: OrderedDict[tuple, dto.DecisionRegionDTO] = OrderedDict()
+_region_cells = 0  # Sum of _cells() over _regions, guarded by _lock
+_cuts: OrderedDict[str, dict[int, np.ndarray | None]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cells(result: dto.DecisionRegionDTO) -> int:
+    """
+    Cache cost of a result: its grid cells, or its number of rectangles.
+    """
+    if result.grid is not None:
+        return int(result.grid.size)
+    return len(result.rectangles or ())
+
+
+def _split_cuts(key: str, flat: FlatTree) -> dict[int, np.ndarray | None]:
+    """
+    Sorted split thresholds per numeric feature (None for categorical features), per model.
+    """
+    with _lock:
+        cuts = _cuts.get(key)
+    if cuts is not None:
+        return cuts
+    internal = np.flatnonzero(flat.feature != LEAF)
+    cuts = {}
+    for f in np.unique(flat.feature[internal]).tolist():
+        nodes = internal[flat.feature[internal] == f]
+        if (flat.cat_index[nodes] != LEAF).any():
+            cuts[f] = None
+        else:
+            cuts[f] = np.unique(flat.threshold[nodes])
+    with _lock:
+        _cuts[key] = cuts
+        if len(_cuts) > REGION_CACHE_SIZE:
+            _cuts.popitem(last=False)
+    return cuts
+
+
+def _slice_cell(cuts: dict[int, np.ndarray | None], x: np.ndarray, feature_x: int, feature_y: int) -> tuple:
+    """
+    Identify the slice by the threshold cell of every fixed feature the tree splits on.
+    """
+    cell = []
+    for f, thresholds in cuts.items():
+        if f in (feature_x, feature_y):
+            continue
+        v = x[f]
+        if v != v:  # NaN
+            cell.append(None)
+        elif thresholds is None:
+            cell.append(float(v))
+        else:
+            # Values equal to a threshold go left, like the values just below it
+            cell.append(int(np.searchsorted(thresholds, v, side="left")))
+    return tuple(cell)
+
+
+def _axis_range(cuts: dict[int, np.ndarray | None], feature: int, width: int, value: float) -> list[float]:
+    """
+    Default extent of an axis: the feature's split thresholds plus padding. A feature the
+    tree never splits on is centred on its given value, so the plot covers realistic inputs.
+    """
+    thresholds = cuts.get(feature, np.empty(0))
+    if thresholds is None:
+        return [0.0, float(max(width - 1, 0))]
+    if not len(thresholds):
+        centre = float(value) if np.isfinite(value) else 0.0
+        half = max(UNSPLIT_HALF_WIDTH * abs(centre), 1.0)
+        return [centre - half, centre + half]
+    lo, hi = float(thresholds[0]), float(thresholds[-1])
+    pad = RANGE_PADDING * (hi - lo) if hi > lo else 1.0
+    return [lo - pad, hi + pad]
+
+
+def _rectangles(flat: FlatTree, x: np.ndarray, feature_x: int, feature_y: int,
+                x_range: list[float], y_range: list[float]) -> list[dict[str, Any]]:
+    """
+    Exact regions clipped to the axis ranges; empty ones are dropped.
+    """
+    rectangles = []
+    for leaf, bounds, x_mask, y_mask in slice_boxes(flat, x, feature_x, feature_y):
+        x0, x1 = max(bounds[0], x_range[0]), min(bounds[1], x_range[1])
+        y0, y1 = max(bounds[2], y_range[0]), min(bounds[3], y_range[1])
+        if (x_mask is None and x0 >= x1) or (y_mask is None and y0 >= y1):
+            continue
+        nid = int(flat.node_ids[leaf])
+        rectangles.append({
+            "x0": None if x_mask is not None else float(x0),
+            "x1": None if x_mask is not None else float(x1),
+            "y0": None if y_mask is not None else float(y0),
+            "y1": None if y_mask is not None else float(y1),
+            "x_categories": None if x_mask is None else np.flatnonzero(x_mask).tolist(),
+            "y_categories": None if y_mask is None else np.flatnonzero(y_mask).tolist(),
+            "predicted_class": flat.value[leaf].item(),
+            "leaf_id": nid if nid >= 0 else None,
+        })
+    return rectangles
+
+
+def _grid(flat: FlatTree, x: np.ndarray, feature_x: int, feature_y: int,
+          xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Predicted class on every (y, x) grid point, in one vectorized call.
+    """
+    points = np.tile(x, (len(ys) * len(xs), 1))
+    points[:, feature_x] = np.tile(xs, len(ys))
+    points[:, feature_y] = np.repeat(ys, len(xs))
+    return flat.predict(points).reshape(len(ys), len(xs))
+
+
+def decision_regions(tree: dict[str, Any],
+                     feature_x: int,
+                     feature_y: int,
+                     x: list[float],
+                     mode: str = "rectangles",
+                     resolution: int = RESOLUTION,
+                     x_range: list[float] | None = None,
+                     y_range: list[float] | None = None) -> dto.DecisionRegionDTO:
+    """
+    Decision regions of a tree on two features, the others fixed at the values in x.
+    Args:
+        tree (dict[str, Any]): TreeResponseDTO.to_dict() output.
+        feature_x (int): Feature on the horizontal axis.
+        feature_y (int): Feature on the vertical axis.
+        x (list[float]): Values of every feature; the two plotted ones are ignored. NaN = missing.
+        mode (str): "rectangles" for exact leaf boxes, "grid" for a class raster.
+        resolution (int): Grid cells per numeric axis (grid mode only).
+        x_range (list[float], optional): [min, max] of the horizontal axis. Defaults to the split
+            thresholds, or around x[feature_x] if the tree never splits on it.
+        y_range (list[float], optional): [min, max] of the vertical axis. Defaults likewise.
+    Returns:
+        dto.DecisionRegionDTO: Regions of the slice.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    if not 2 <= resolution <= MAX_RESOLUTION:
+        raise ValueError(f"resolution must be between 2 and {MAX_RESOLUTION}")
+    x = np.asarray(x, dtype=np.float64)
+    if not (0 <= feature_x < len(x) and 0 <= feature_y < len(x)) or feature_x == feature_y:
+        raise ValueError("feature_x and feature_y must be two different indices into x")
+    for extent in (x_range, y_range):
+        if extent is not None and (len(extent) != 2 or not extent[0] < extent[1]):
+            raise ValueError("Ranges must be [min, max] with min < max")
+
+    key = model_key(tree)
+    flat = prediction_batcher.model(key, tree)
+    cuts = _split_cuts(key, flat)
+    if cuts and max(cuts) >= len(x):
+        raise ValueError(f"x needs at least {max(cuts) + 1} features")
+
+    width = flat.cat_table.shape[1]
+    x_range = list(x_range) if x_range is not None else _axis_range(cuts, feature_x, width, x[feature_x])
+    y_range = list(y_range) if y_range is not None else _axis_range(cuts, feature_y, width, x[feature_y])
+    cache_key = (key, mode, feature_x, feature_y, _slice_cell(cuts, x, feature_x, feature_y),
+                 tuple(x_range), tuple(y_range), resolution if mode == "grid" else None)
+    with _lock:
+        result = _regions.get(cache_key)
+        if result is not None:
+            _regions.move_to_end(cache_key)
+            return result
+
+    result = dto.DecisionRegionDTO(feature_x, feature_y, mode, x_range, y_range)
+    if mode == "rectangles":
+        result.rectangles = _rectangles(flat, x, feature_x, feature_y, x_range, y_range)
+    else:
+        axes = []
+        for f, extent in ((feature_x, x_range), (feature_y, y_range)):
+            if cuts.get(f, ()) is None:  # Categorical axis: one cell per category code
+                axes.append(np.arange(width, dtype=np.float64))
+            else:
+                axes.append(np.linspace(extent[0], extent[1], resolution))
+        result.xs, result.ys = axes[0].tolist(), axes[1].tolist()
+        result.grid = _grid(flat, x, feature_x, feature_y, *axes)
+
+    cells = _cells(result)
+    if cells > MAX_CACHED_GRID_CELLS:
+        return result
+    global _region_cells
+    with _lock:
+        if cache_key not in _regions:
+            _regions[cache_key] = result
+            _region_cells += cells
+        while len(_regions) > REGION_CACHE_SIZE or _region_cells > REGION_CACHE_CELLS:
+            _, evicted = _regions.popitem(last=False)
+            _region_cells -= _cells(evicted)
+    return result
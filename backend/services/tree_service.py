@@ -5,16 +5,26 @@ from sklearn.model_selection import train_test_split
 import numpy as np
 from sklearn import metrics
 
+TEST_SIZE = 0.33      # Fraction of Iris held out for evaluation
+RANDOM_STATE = 42     # Seed of the train/test split
+
+def iris_split():
+    """
+    Load Iris and split it the same way every time.
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test, features, labels, feature_names, label_names)
+    """
+    features, labels, feature_names, label_names = loaders.load_iris_dataset()
+    X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    return X_train, X_test, y_train, y_test, features, labels, feature_names, label_names
+
 def tree_service():
     
     # Initialize the custom Decision Tree model
     tree_model = tree()
 
-    # Load the Iris dataset
-    features, labels, feature_names, label_names = loaders.load_iris_dataset()
-
-    # Split the data into training and test sets
-    X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=0.33, random_state=42)
+    # Load the Iris dataset and split it into training and test sets
+    X_train, X_test, y_train, y_test, features, labels, feature_names, label_names = iris_split()
 
     # Train the model
     tree_model.fit(X_train, y_train)
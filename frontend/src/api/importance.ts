@@ -0,0 +1,21 @@
+import { API_BASE } from "./config";
+import type { FeatureImportanceDTO, TreeDTO } from "./types";
+
+
+export async function getFeatureImportance(
+    tree: TreeDTO,
+    nRepeats = 10,
+    seed = 0
+): Promise<FeatureImportanceDTO> {
+    const res = await fetch(`${API_BASE}/api/importance`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ tree, n_repeats: nRepeats, seed }),
+    });
+    if (!res.ok) {
+        throw new Error(`Feature importance failed: ${res.status}`);
+    }
+    return res.json() as Promise<FeatureImportanceDTO>;
+}
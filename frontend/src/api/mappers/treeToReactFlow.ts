@@ -12,12 +12,19 @@ function formatNodeLabel(n: TreeNodeDTO, featureNames: string[], labelNames: str
   const thr = n.threshold != null ? n.threshold : "?";
   const ig = n.information_gain != null ? `\nIG: ${n.information_gain.toFixed(3)}` : "";
 
+  if (n.categories != null) {
+    return `${feature} in {${n.categories.join(", ")}}${ig}`;
+  }
   return `${feature} < ${thr}${ig}`;
 }
 
 function edgeLabel(e: TreeEdgeDTO, featureNames: string[]) {
   const f = e.feature != null ? featureNames[e.feature] : "feature?";
-  return `${f} ${e.operator} ${e.threshold}`;
+  const missing = e.missing ? " or missing" : "";
+  if (e.categories != null) {
+    return `${f} ${e.operator} {${e.categories.join(", ")}}${missing}`;
+  }
+  return `${f} ${e.operator} ${e.threshold}${missing}`;
 }
 
 export function treeDtoToReactFlow(tree: TreeDTO): { nodes: Node[]; edges: Edge[] } {
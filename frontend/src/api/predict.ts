@@ -1,5 +1,5 @@
 import { API_BASE } from "./config";
-import type { PredictionDTO } from "./types";
+import type { CounterfactualDTO, PredictionDTO } from "./types";
 import type { TreeDTO } from "./types";
 
 
@@ -20,4 +20,23 @@ export async function getPrediction(
     const jsonResponse = await res.json();
     console.log("Received prediction response:", jsonResponse);
     return jsonResponse as Promise<PredictionDTO>;
-}
\ No newline at end of file
+}
+
+export async function getCounterfactuals(
+    rows: (number | null)[][],
+    tree: TreeDTO,
+    norm: "l1" | "l2" = "l2",
+    scale: number[] | null = null
+): Promise<CounterfactualDTO[][]> {
+    const res = await fetch(`${API_BASE}/api/counterfactuals`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ x: rows, tree, norm, scale }),
+    });
+    if (!res.ok) {
+        throw new Error(`Counterfactuals failed: ${res.status}`);
+    }
+    return res.json() as Promise<CounterfactualDTO[][]>;
+}
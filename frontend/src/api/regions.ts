@@ -0,0 +1,31 @@
+import { API_BASE } from "./config";
+import type { DecisionRegionDTO, TreeDTO } from "./types";
+
+
+export async function getDecisionRegions(
+    tree: TreeDTO,
+    featureX: number,
+    featureY: number,
+    fixedValues: (number | null)[],
+    mode: "rectangles" | "grid" = "rectangles",
+    resolution = 100
+): Promise<DecisionRegionDTO> {
+    const res = await fetch(`${API_BASE}/api/regions`, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+            tree,
+            feature_x: featureX,
+            feature_y: featureY,
+            x: fixedValues,
+            mode,
+            resolution,
+        }),
+    });
+    if (!res.ok) {
+        throw new Error(`Decision regions failed: ${res.status}`);
+    }
+    return res.json() as Promise<DecisionRegionDTO>;
+}
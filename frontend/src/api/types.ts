@@ -10,6 +10,7 @@ export type TreeDTO = {
         orientation: "rows=actual,cols=predicted";
         normalized: boolean;
   };
+    task?: "classification" | "regression";
 }
 
 export type TreeNodeDTO = {
@@ -24,6 +25,11 @@ export type TreeNodeDTO = {
     predicted_class?: number | null;
     left_child?: number | null;
     right_child?: number | null;
+    categories?: number[] | null;   // category codes sent left (categorical splits)
+    missing_left?: boolean | null;  // whether missing values go left (null = right)
+    mean?: number | null;           // mean target (regression trees)
+    variance?: number | null;       // target variance (regression trees)
+    n_samples?: number | null;      // training samples at the node
 };
 
 export type TreeEdgeDTO = {
@@ -32,10 +38,59 @@ export type TreeEdgeDTO = {
     branch: string;
     operator: string;
     feature: number;
-    threshold: number;
+    threshold: number | null;
+    categories?: number[] | null;   // category set of a categorical split
+    missing?: boolean;              // whether missing values follow this edge
+};
+
+export type CounterfactualDTO = {
+    target_class: number;
+    distance: number;
+    leaf_id: number | null;
+    x: (number | null)[];
+    changed_features: number[];
 };
 
 export type PredictionDTO = {
     predicted_class: number;
     path: number[];
-};
\ No newline at end of file
+    counterfactuals?: CounterfactualDTO[] | null;
+};
+
+export type FeatureImportanceDTO = {
+    feature_names: string[];
+    impurity_importance: number[];
+    permutation_mean: number[] | null;
+    permutation_std: number[] | null;
+    ci_low: number[] | null;
+    ci_high: number[] | null;
+    confidence: number | null;
+    baseline_accuracy: number | null;
+    n_repeats: number | null;
+    seed: number | null;
+    metric: "accuracy" | "mse";
+    baseline_mse: number | null;
+};
+
+export type DecisionRegionRectangle = {
+    x0: number | null;
+    x1: number | null;
+    y0: number | null;
+    y1: number | null;
+    x_categories: number[] | null;
+    y_categories: number[] | null;
+    predicted_class: number;
+    leaf_id: number | null;
+};
+
+export type DecisionRegionDTO = {
+    feature_x: number;
+    feature_y: number;
+    mode: "rectangles" | "grid";
+    x_range: [number, number];
+    y_range: [number, number];
+    rectangles: DecisionRegionRectangle[] | null;
+    xs: number[] | null;
+    ys: number[] | null;
+    grid: number[][] | null;
+};
@@ -0,0 +1,96 @@
+"""
+Open-loop load test for /predict micro-batching.
+
+Requests arrive as a Poisson process at a fixed offered rate, independent of how
+fast earlier ones complete, and go through the full ASGI app (routing, request
+parsing, PredictionBatcher, response encoding) via httpx's in-process transport.
+Latency is measured from each request's scheduled arrival time, so time spent
+waiting for a busy event loop counts the same with and without batching.
+For every batching window and offered rate it reports completed throughput and
+latency percentiles; an offered rate the server cannot sustain shows up as
+throughput below the offered rate and a growing tail.
+
+Usage:
+    python -m scripts.bench_batching [--rates 500 1000 2000] [--seconds 2] [--windows 0 0.5 2 5] [--depth 8]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import time
+import httpx
+import numpy as np
+
+from backend.data import loaders
+from backend.main import app
+from backend.models.decision_tree import DecisionTree
+from backend.dashboard.tree_exporter import export_tree
+from backend.services.batching_service import prediction_batcher
+from scripts.bench_predict import random_tree, N_FEATURES
+
+
+def iris_tree() -> tuple[dict, np.ndarray]:
+    features, labels, feature_names, label_names = loaders.load_iris_dataset()
+    model = DecisionTree()
+    model.fit(features, labels)
+    tree = export_tree(model, feature_names, label_names, None, None).to_dict()
+    return tree, features
+
+
+def synthetic_tree(depth: int) -> tuple[dict, np.ndarray]:
+    tree = export_tree(random_tree(depth), [], [], None, None).to_dict()
+    return tree, np.random.default_rng(1).random((200, N_FEATURES))
+
+
+async def _request(client: httpx.AsyncClient, arrival: float, body: dict, latencies: list, errors: list):
+    await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+    response = await client.post("/api/predict", json=body)
+    if response.status_code != 200:
+        errors.append(response.status_code)
+    latencies.append(time.perf_counter() - arrival)
+
+
+async def _load(client: httpx.AsyncClient, rate: float, seconds: float, tree: dict, rows: list, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(1.0 / rate, size=int(rate * seconds))
+    start = time.perf_counter() + 0.05
+    arrivals = start + np.cumsum(gaps)
+    latencies: list[float] = []
+    errors: list[int] = []
+    await asyncio.gather(*[_request(client, float(t), {"tree": tree, "x": rows[i % len(rows)]}, latencies, errors)
+                           for i, t in enumerate(arrivals)])
+    elapsed = time.perf_counter() - start
+    lat_ms = np.array(latencies) * 1e3
+    return (len(latencies) / elapsed, np.percentile(lat_ms, 50), np.percentile(lat_ms, 99),
+            lat_ms.max(), len(errors))
+
+
+async def _run(windows: list[float], rates: list[float], seconds: float, max_batch: int, tree: dict, rows: list):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up: import the model into the batcher cache
+        await client.post("/api/predict", json={"tree": tree, "x": rows[0]})
+        for window in windows:
+            prediction_batcher.window_s = window / 1000.0
+            prediction_batcher.max_batch_size = max_batch
+            for rate in rates:
+                rps, p50, p99, worst, errors = await _load(client, rate, seconds, tree, rows)
+                print(f"{window:>9.1f} {rate:>8.0f} | {rps:>9.0f} {p50:>8.2f} {p99:>8.2f} {worst:>8.2f} | {errors:>6}")
+
+
+def run(windows: list[float], rates: list[float], seconds: float, max_batch: int, depth: int | None):
+    tree, features = iris_tree() if depth is None else synthetic_tree(depth)
+    rows = features.tolist()
+    print(f"{len(tree['nodes'])}-node tree, open-loop Poisson arrivals, {seconds:g} s per point, max batch {max_batch}")
+    print(f"{'window ms':>9} {'offered':>8} | {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} | {'errors':>6}")
+    asyncio.run(_run(windows, rates, seconds, max_batch, tree, rows))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 0.5, 2, 5])
+    parser.add_argument("--rates", type=float, nargs="+", default=[500, 1000, 2000])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--depth", type=int, default=None, help="Use a random complete tree instead of Iris")
+    args = parser.parse_args()
+    run(args.windows, args.rates, args.seconds, args.max_batch, args.depth)
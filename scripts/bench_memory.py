@@ -0,0 +1,161 @@
+"""
+Memory benchmark for the decision tree node and DTO layouts.
+
+Builds complete binary trees of 10^4 to 10^6 nodes and reports bytes per node
+for the model graph (Node) and the exported DTO graph (TreeResponseDTO), using
+the current __slots__ / count-vector layout ("after") and a replica of the
+previous __dict__ / dict-of-counts layout with stored edges ("before").
+
+Usage:
+    python -m scripts.bench_memory [--sizes 10000 100000 1000000] [--classes 3]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import tracemalloc
+import numpy as np
+
+from backend.models.decision_tree import DecisionTree, Node
+from backend.dashboard.tree_exporter import export_tree
+
+
+class _LegacyNode:
+    """Previous Node layout: per-instance __dict__, class counts as {np.int64: np.int64}."""
+    def __init__(self, id=None, feature=None, threshold=None, left=None, right=None,
+                 value=None, IG=None, samples=None, class_counts=None, predicted_class=None):
+        self.id = id
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.IG = IG
+        self.samples = samples
+        self.class_counts = class_counts
+        self.predicted_class = predicted_class
+
+
+class _LegacyNodeDTO:
+    """Previous TreeNodeDTO layout (per-instance __dict__)."""
+    def __init__(self, **kwargs):
+        for k in ("id", "feature", "threshold", "value", "information_gain", "is_leaf",
+                  "samples", "class_counts", "depth", "predicted_class", "left_id", "right_id"):
+            setattr(self, k, kwargs.get(k))
+
+
+class _LegacyEdgeDTO:
+    """Previous TreeEdgeDTO layout, stored once per edge."""
+    def __init__(self, source, target, branch, operator, feature, threshold):
+        self.source = source
+        self.target = target
+        self.branch = branch
+        self.operator = operator
+        self.feature = feature
+        self.threshold = threshold
+
+
+def _legacy_counts(rng: np.random.Generator, n_classes: int) -> dict:
+    values = np.arange(n_classes)
+    counts = rng.integers(1, 50, size=n_classes)
+    return dict(zip(values, counts))
+
+
+def _counts_sum(counts) -> int:
+    return sum(counts.values()) if isinstance(counts, dict) else int(counts.sum())
+
+
+def build_tree(n_nodes: int, n_classes: int, legacy: bool = False):
+    """
+    Build a complete binary tree with n_nodes nodes (heap order) with random splits.
+    Args:
+        n_nodes (int): Number of nodes.
+        n_classes (int): Length of the class distribution at each node.
+        legacy (bool): Build _LegacyNode objects instead of Node.
+    Returns:
+        Node | _LegacyNode: The root node.
+    """
+    rng = np.random.default_rng(0)
+    cls = _LegacyNode if legacy else Node
+    nodes = []
+    for i in range(n_nodes):
+        is_leaf = 2 * i + 1 >= n_nodes
+        if legacy:
+            counts = _legacy_counts(rng, n_classes)
+            majority = max(counts, key=counts.get)
+        else:
+            counts = rng.integers(1, 50, size=n_classes)
+            majority = int(np.argmax(counts))
+        node = cls(
+            feature=None if is_leaf else int(rng.integers(0, 8)),
+            threshold=None if is_leaf else float(rng.random()),
+            value=majority if is_leaf else None,
+            IG=None if is_leaf else float(rng.random()),
+            samples=_counts_sum(counts),
+            class_counts=counts,
+            predicted_class=majority,
+        )
+        nodes.append(node)
+    for i in range(n_nodes):
+        l, r = 2 * i + 1, 2 * i + 2
+        if r < n_nodes:
+            nodes[i].left = nodes[l]
+            nodes[i].right = nodes[r]
+    return nodes[0]
+
+
+def export_legacy(root: _LegacyNode):
+    """Export a legacy tree the way the previous exporter did: node DTOs plus stored edge DTOs."""
+    dto_nodes, dto_edges = [], []
+    stack = [(root, 0)]
+    ids = {root: 0}
+    while stack:
+        node, depth = stack.pop()
+        nid = ids[node]
+        d = _LegacyNodeDTO(id=nid, feature=node.feature, threshold=node.threshold, value=node.value,
+                           information_gain=node.IG, is_leaf=node.value is not None,
+                           samples=node.class_counts, depth=depth, predicted_class=node.predicted_class)
+        for branch, op, child in (("left", "<=", node.left), ("right", ">", node.right)):
+            if child is None:
+                continue
+            ids[child] = len(ids)
+            setattr(d, f"{branch}_id", ids[child])
+            dto_edges.append(_LegacyEdgeDTO(nid, ids[child], branch, op, node.feature, node.threshold))
+            stack.append((child, depth + 1))
+        dto_nodes.append(d)
+    return dto_nodes, dto_edges
+
+
+def _measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    obj = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current - base
+
+
+def run(sizes: list[int], n_classes: int):
+    print(f"{'nodes':>10} | {'Node before':>12} {'Node after':>11} | {'DTO before':>11} {'DTO after':>10}  (bytes/node)")
+    for n in sizes:
+        row = []
+        for legacy in (True, False):
+            root, node_bytes = _measure(lambda: build_tree(n, n_classes, legacy))
+            if legacy:
+                exported, dto_bytes = _measure(lambda: export_legacy(root))
+            else:
+                model = DecisionTree(root=root)
+                exported, dto_bytes = _measure(lambda: export_tree(model, [], [], None, None))
+            row.append((node_bytes / n, dto_bytes / n))
+            del root, exported
+            gc.collect()
+        (nb, db), (na, da) = row
+        print(f"{n:>10} | {nb:>12.1f} {na:>11.1f} | {db:>11.1f} {da:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--classes", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.classes)
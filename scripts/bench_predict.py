@@ -0,0 +1,80 @@
+"""
+Single-row prediction latency benchmark.
+
+Compares DecisionTree.predict_one (recursive interpreter), FlatTree.predict_one
+(flat-array engine) and the code-generated predict function on random complete
+trees of increasing depth. Inputs are plain lists, as they arrive from /api/predict.
+
+Usage:
+    python -m scripts.bench_predict [--depths 3 6 10 13] [--rows 2000]
+"""
+from __future__ import annotations
+import argparse
+import time
+import numpy as np
+
+from backend.models.decision_tree import DecisionTree, Node
+from backend.models.flat_tree import FlatTree
+from backend.models import codegen
+
+N_FEATURES = 8
+
+
+def random_tree(depth: int, seed: int = 0) -> DecisionTree:
+    """
+    Build a complete tree of the given depth with random splits and BFS node ids.
+    Args:
+        depth (int): Depth of every leaf.
+        seed (int): Random seed.
+    Returns:
+        DecisionTree: Tree with 2^(depth+1) - 1 nodes.
+    """
+    rng = np.random.default_rng(seed)
+    n_nodes = 2 ** (depth + 1) - 1
+    nodes = []
+    for i in range(n_nodes):
+        if 2 * i + 1 >= n_nodes:
+            nodes.append(Node(id=i, value=int(rng.integers(0, 3))))
+        else:
+            nodes.append(Node(id=i, feature=int(rng.integers(0, N_FEATURES)),
+                              threshold=float(rng.random()), predicted_class=0))
+    for i in range(n_nodes // 2):
+        nodes[i].left, nodes[i].right = nodes[2 * i + 1], nodes[2 * i + 2]
+    return DecisionTree(root=nodes[0])
+
+
+def _per_call_us(fn, rows) -> float:
+    start = time.perf_counter()
+    for x in rows:
+        fn(x)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def run(depths: list[int], n_rows: int):
+    rows = np.random.default_rng(1).random((n_rows, N_FEATURES)).tolist()
+    print(f"{'depth':>5} {'nodes':>7} | {'interpreter':>11} {'flat':>8} {'codegen':>8}  (us/row) | codegen build (ms)")
+    for depth in depths:
+        model = random_tree(depth)
+        flat = FlatTree.from_tree(model)
+
+        start = time.perf_counter()
+        compiled = codegen.compile_tree(model)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        for x in rows[:50]:
+            expected = model.predict_one(x)
+            got = compiled(x)
+            assert expected == (got[0], list(got[1])) == flat.predict_one(x)
+
+        interp = _per_call_us(model.predict_one, rows)
+        flat_us = _per_call_us(flat.predict_one, rows)
+        gen_us = _per_call_us(compiled, rows)
+        print(f"{depth:>5} {len(flat):>7} | {interp:>11.2f} {flat_us:>8.2f} {gen_us:>8.2f}             | {build_ms:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depths", type=int, nargs="+", default=[3, 6, 10, 13])
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.depths, args.rows)
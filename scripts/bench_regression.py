@@ -0,0 +1,125 @@
+"""
+Scale benchmark for regression trees, side by side with classification.
+
+Runs the classification benchmarks on RegressionTree:
+- fit: time to fit 10^3 to 10^5 rows (same features; continuous targets vs classes
+  derived from them);
+- predict: single-row latency of the interpreter, FlatTree and generated code on
+  fitted trees of increasing depth;
+- memory: bytes per node of the fitted Node graph and of the export_tree DTO graph.
+
+Usage:
+    python -m scripts.bench_regression [--rows 1000 10000 100000] [--depths 4 8 12] [--features 8]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import time
+import tracemalloc
+import numpy as np
+
+from backend.models.decision_tree import DecisionTree
+from backend.models.regression_tree import RegressionTree
+from backend.models.flat_tree import FlatTree
+from backend.dashboard.tree_exporter import export_tree
+
+
+def make_data(n_rows: int, n_features: int, seed: int = 0):
+    """
+    Random features with a non-linear continuous target and a 3-class label cut from it.
+    Args:
+        n_rows (int): Number of rows.
+        n_features (int): Number of features.
+        seed (int): Random seed.
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: (features, targets, labels)
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    y = np.sin(2 * X[:, 0]) + X[:, 1] * X[:, 2] + 0.1 * rng.normal(size=n_rows)
+    labels = np.digitize(y, np.quantile(y, [1 / 3, 2 / 3]))
+    return X, y, labels
+
+
+def _fit_s(model, X, y) -> float:
+    start = time.perf_counter()
+    model.fit(X, y)
+    return time.perf_counter() - start
+
+
+def _per_call_us(fn, rows) -> float:
+    start = time.perf_counter()
+    for x in rows:
+        fn(x)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def _bytes_per_node(fn, n_nodes: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    obj = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return (current - base) / n_nodes
+
+
+def bench_fit(row_counts: list[int], n_features: int):
+    print(f"{'rows':>8} | {'classification':>14} {'regression':>10}  (fit seconds, max_depth=8)")
+    for n_rows in row_counts:
+        X, y, labels = make_data(n_rows, n_features)
+        cls_s = _fit_s(DecisionTree(max_depth=8, min_information_gain=0.0), X, labels)
+        reg_s = _fit_s(RegressionTree(max_depth=8), X, y)
+        print(f"{n_rows:>8} | {cls_s:>14.3f} {reg_s:>10.3f}")
+
+
+def bench_predict(depths: list[int], n_features: int, n_rows: int = 2000):
+    X, y, _ = make_data(20_000, n_features)
+    rows = X[:n_rows].tolist()
+    print(f"{'depth':>5} {'nodes':>7} | {'interpreter':>11} {'flat':>8} {'codegen':>8}  (us/row)")
+    for depth in depths:
+        model = RegressionTree(max_depth=depth, min_samples_per_leaf=1)
+        model.fit(X, y)
+        flat = FlatTree.from_tree(model)
+        interp = _per_call_us(model.predict_one, rows)
+        flat_us = _per_call_us(flat.predict_one, rows)
+        model.compile()
+        for x in rows[:50]:
+            assert model.predict_one(x)[0] == flat.predict_one(x)[0]
+        gen_us = _per_call_us(model.predict_one, rows)
+        print(f"{depth:>5} {len(flat):>7} | {interp:>11.2f} {flat_us:>8.2f} {gen_us:>8.2f}")
+
+
+def _fitted_root(model, X, y):
+    model.root = None
+    model.fit(X, y)
+    return model.root
+
+
+def bench_memory(depths: list[int], n_features: int):
+    X, y, labels = make_data(20_000, n_features)
+    print(f"{'depth':>5} {'nodes':>7} | {'Node cls':>8} {'Node reg':>8} | {'DTO cls':>7} {'DTO reg':>7}  (bytes/node)")
+    for depth in depths:
+        row = []
+        for model, target in ((DecisionTree(max_depth=depth, min_samples_per_leaf=1, min_information_gain=0.0), labels),
+                              (RegressionTree(max_depth=depth, min_samples_per_leaf=1), y)):
+            n_nodes = len(FlatTree.from_tree(model)) if _fitted_root(model, X, target) else 1
+            node_bytes = _bytes_per_node(lambda: _fitted_root(model, X, target), n_nodes)
+            dto_bytes = _bytes_per_node(lambda: export_tree(model, [], [], None, None), n_nodes)
+            row.append((n_nodes, node_bytes, dto_bytes))
+        (_, nb_cls, db_cls), (n_reg, nb_reg, db_reg) = row
+        print(f"{depth:>5} {n_reg:>7} | {nb_cls:>8.1f} {nb_reg:>8.1f} | {db_cls:>7.1f} {db_reg:>7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--depths", type=int, nargs="+", default=[4, 8, 12])
+    parser.add_argument("--features", type=int, default=8)
+    args = parser.parse_args()
+    bench_fit(args.rows, args.features)
+    print()
+    bench_predict(args.depths, args.features)
+    print()
+    bench_memory(args.depths, args.features)
@@ -0,0 +1,92 @@
+"""
+ModelStore: publish -> load -> to_tree must round-trip a tree, versions count up
+from 1, failed publishes leave no staging directories, names are validated on
+reads as well as writes, and the per-process cache of open maps stays bounded.
+"""
+import os
+import numpy as np
+import pytest
+
+from backend.data import model_store as store_module
+from backend.data.model_store import ModelStore
+from backend.models.decision_tree import DecisionTree
+from backend.models.regression_tree import RegressionTree
+
+
+def _fitted_tree(seed: int = 0) -> tuple[DecisionTree, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 3))
+    X[rng.random(X.shape) < 0.1] = np.nan
+    y = np.where(np.nan_to_num(X[:, 0]) > 0.2, 10, np.where(np.nan_to_num(X[:, 1]) > 0, -3, 7))
+    model = DecisionTree(max_depth=5)
+    model.fit(X, y)
+    return model, X
+
+
+def test_round_trip(tmp_path):
+    store = ModelStore(str(tmp_path))
+    model, X = _fitted_tree()
+    version = store.publish("iris", model, ["a", "b", "c"], ["x", "y", "z"])
+
+    with store.load("iris") as stored:
+        assert stored.version == version == 1
+        assert stored.meta["feature_names"] == ["a", "b", "c"]
+        assert stored.flat.n_features() <= 3
+        rebuilt = stored.to_tree()
+        for x in X.tolist():
+            assert stored.flat.predict_one(x) == model.predict_one(x)
+            assert rebuilt.predict_one(x) == model.predict_one(x)
+    assert rebuilt.root.samples == len(X)
+    assert np.array_equal(rebuilt.classes, model.classes)
+
+
+def test_versions_and_staging_cleanup(tmp_path):
+    store = ModelStore(str(tmp_path))
+    model, _ = _fitted_tree()
+    assert [store.publish("m", model) for _ in range(3)] == [1, 2, 3]
+    assert store.list_versions("m") == [1, 2, 3]
+    assert store.list_models() == ["m"]
+
+    regression = RegressionTree(max_depth=2)
+    regression.fit(np.arange(20.0).reshape(-1, 1), np.arange(20.0))
+    with pytest.raises(ValueError):
+        store.publish("m", regression)
+    assert sorted(os.listdir(tmp_path / "m")) == ["v000001", "v000002", "v000003"]
+
+    with store.load("m", 2) as stored:
+        assert stored.version == 2
+    with pytest.raises(KeyError):
+        with store.load("m", 9):
+            pass
+
+
+@pytest.mark.parametrize("name", ["..", ".hidden", "a/b", ""])
+def test_invalid_names(tmp_path, name):
+    store = ModelStore(str(tmp_path))
+    model, _ = _fitted_tree()
+    with pytest.raises(ValueError):
+        store.publish(name, model)
+    with pytest.raises(ValueError):
+        store.list_versions(name)
+    with pytest.raises(ValueError):
+        with store.load(name):
+            pass
+
+
+def test_open_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(store_module, "OPEN_CACHE_SIZE", 2)
+    store = ModelStore(str(tmp_path))
+    model, X = _fitted_tree()
+    x = X[0].tolist()
+
+    store.publish("m", model)
+    with store.load("m") as first:
+        # Evicted while in use: stays readable until the block exits
+        for _ in range(3):
+            store.publish("m", model)
+            with store.load("m"):
+                pass
+        assert first.evicted
+        assert first.flat.predict_one(x) == model.predict_one(x)
+    assert len(store.opened) == 2
+    assert first.flat.feature._mmap.closed
@@ -0,0 +1,73 @@
+"""
+The interpreter (DecisionTree.predict_one), FlatTree and generated code must
+agree on every input, including categorical codes and missing values.
+"""
+import numpy as np
+import pytest
+
+from backend.models import codegen
+from backend.models.decision_tree import DecisionTree, Node
+from backend.models.flat_tree import FlatTree
+
+
+def _fitted_tree(categorical: bool, seed: int = 0) -> tuple[DecisionTree, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    n = 600
+    X = np.column_stack([rng.normal(size=n), rng.integers(0, 6, n), rng.normal(size=n)]).astype(float)
+    y = np.where(np.isin(X[:, 1], [1, 4]), 0, np.where(X[:, 0] + X[:, 2] > 0.3, 1, 2))
+    X[rng.random(X.shape) < 0.1] = np.nan
+    model = DecisionTree(max_depth=8, categorical_features=[1] if categorical else None,
+                         min_information_gain=0.0)
+    model.fit(X, y)
+
+    queries = np.column_stack([rng.normal(size=300), rng.integers(-1, 8, 300), rng.normal(size=300)]).astype(float)
+    queries[rng.random(queries.shape) < 0.15] = np.nan
+    return model, np.vstack([X[:200], queries])
+
+
+def _chain(depth: int) -> DecisionTree:
+    """A tree that is a single left spine of the given depth."""
+    root = node = Node(id=0, feature=0, threshold=0.0, predicted_class=0)
+    for d in range(1, depth):
+        node.right = Node(id=2 * d, value=1)
+        node.left = Node(id=2 * d - 1, feature=0, threshold=-float(d), predicted_class=0)
+        node = node.left
+    node.left, node.right = Node(id=2 * depth - 1, value=0), Node(id=2 * depth, value=1)
+    return DecisionTree(root=root)
+
+
+@pytest.mark.parametrize("categorical", [False, True])
+def test_backends_agree(categorical):
+    model, X = _fitted_tree(categorical)
+    flat = FlatTree.from_tree(model)
+    compiled = codegen.compile_tree(model)
+    batch = flat.predict(X)
+
+    for x, batch_pred in zip(X.tolist(), batch.tolist()):
+        expected = model.predict_one(x)
+        pred, path = compiled(x)
+        assert (pred, list(path)) == expected
+        assert flat.predict_one(x) == expected
+        assert batch_pred == expected[0]
+
+
+def test_compile_is_used_by_predict_one():
+    model, X = _fitted_tree(categorical=True)
+    expected = [model.predict_one(x) for x in X.tolist()]
+    model.compile()
+    assert model.compiled_predict is not None
+    assert [model.predict_one(x) for x in X.tolist()] == expected
+
+
+def test_node_guard():
+    model, _ = _fitted_tree(categorical=False)
+    n_nodes = len(FlatTree.from_tree(model))
+    with pytest.raises(ValueError):
+        codegen.compile_tree(model, max_nodes=n_nodes - 1)
+    codegen.compile_tree(model, max_nodes=n_nodes)
+
+
+def test_depth_guard():
+    codegen.compile_tree(_chain(codegen.MAX_CODEGEN_DEPTH - 1))
+    with pytest.raises(ValueError):
+        codegen.compile_tree(_chain(codegen.MAX_CODEGEN_DEPTH + 1))